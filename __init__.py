@@ -0,0 +1,5 @@
+"""TimeBench evaluation: the scoring core, the ``evaluate`` metric, CLI and server.
+
+Nothing is imported here, so ``timebench.timebench_core`` stays free of the
+metric's heavy dependencies.
+"""
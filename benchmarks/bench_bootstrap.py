@@ -0,0 +1,92 @@
+"""Benchmark of bootstrap confidence intervals and paired tests on per-sample scores.
+
+Scores a synthetic SQuAD-style corpus once, then times ``bootstrap_confidence_interval``
+for exact match and F1 and ``paired_bootstrap_test`` against a shuffled second system.
+The corpus answers are short team names, so their F1 takes few distinct values. The
+"f1 (free text)" case scores answers of 1 to 12 words instead. Its F1 takes many
+distinct values, and so do the paired differences, which is the slow path.
+
+Usage:
+    python benchmarks/bench_bootstrap.py [--rows 100000] [--resamples 10000]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+from corpus import squad_corpus
+
+from timebench.timebench_bootstrap import (
+    bootstrap_confidence_interval,
+    paired_bootstrap_test,
+)
+from timebench.timebench_core import squad_scores
+from timebench.timebench_eval import TimebenchEval
+
+WORDS = [
+    "the",
+    "club",
+    "signed",
+    "a",
+    "new",
+    "contract",
+    "with",
+    "him",
+    "during",
+    "following",
+    "season",
+    "in",
+]
+
+
+def free_text_f1(rows: int, seed: int = 0) -> list[float]:
+    """F1 of free-text answers of 1 to 12 words against references of 1 to 12 words."""
+    rng = random.Random(seed)
+
+    def answer() -> str:
+        return " ".join(rng.choices(WORDS, k=rng.randint(1, 12)))
+
+    _, f1_scores = squad_scores(
+        [answer() for _ in range(rows)], [answer() for _ in range(rows)]
+    )
+    return f1_scores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--resamples", type=int, default=10_000)
+    args = parser.parse_args()
+
+    predictions, references = squad_corpus(args.rows)
+    scores = TimebenchEval()._compute(
+        predictions, references, "TimeQA", return_average=False
+    )
+    scores["f1 (free text)"] = free_text_f1(args.rows)
+    other = {
+        key: random.Random(0).sample(values, len(values))
+        for key, values in scores.items()
+    }
+
+    for key, values in scores.items():
+        start = time.perf_counter()
+        low, high = bootstrap_confidence_interval(values, args.resamples, seed=0)
+        elapsed = time.perf_counter() - start
+        distinct = len(set(values))
+        print(
+            f"interval {key:<15} [{low:.4f}, {high:.4f}]  {elapsed:.3f}s  "
+            f"({distinct} distinct values)"
+        )
+        start = time.perf_counter()
+        result = paired_bootstrap_test(values, other[key], args.resamples, seed=0)
+        elapsed = time.perf_counter() - start
+        distinct = len(set(np.subtract(values, other[key]).tolist()))
+        print(
+            f"paired   {key:<15} p={result['p_value']:.4f}  {elapsed:.3f}s  "
+            f"({distinct} distinct differences)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Import benchmark: cost of importing ``timebench_core`` versus ``timebench_eval``.
+
+Every measurement runs in a fresh interpreter and reports the import time, the
+peak resident memory of the process and the number of loaded modules, followed by
+the time of scoring one row per task with the imported module.
+
+Usage:
+    python benchmarks/bench_import.py [--repeats 5] [--output import.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+_CHILD = """\
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from timebench.timebench_core import score_task
+for task, reference in [
+    ("TimeQA", "Troyes AC"),
+    ("Date Arithmetic", "Aug, 1804"),
+    ("TimeDial", "B, C"),
+]:
+    score_task(["Thus, the correct answer is: " + reference], [reference], task)
+scored = time.perf_counter()
+json.dump(
+    {{
+        "import": imported - start,
+        "first_score": scored - imported,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "modules": len(sys.modules),
+    }},
+    sys.stdout,
+)
+"""
+
+
+def measure(module: str) -> dict[str, float]:
+    """Import ``module`` in a fresh interpreter and return its costs."""
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(module=module)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for module in ("timebench.timebench_core", "timebench.timebench_eval"):
+        runs = [measure(module) for _ in range(args.repeats)]
+        results[module] = {
+            key: statistics.median(run[key] for run in runs) for key in runs[0]
+        }
+        result = results[module]
+        print(
+            f"{module:<26} import={result['import']:.3f}s  "
+            f"first_score={result['first_score']:.4f}s  "
+            f"max_rss={result['max_rss_mb']:.0f}MB  modules={result['modules']:.0f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
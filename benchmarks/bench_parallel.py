@@ -0,0 +1,61 @@
+"""Scaling benchmark for process-pool scoring with 1, 2, 4, 8 and 16 workers.
+
+Every worker count scores the same synthetic mixed-task corpus; the per-sample
+scores are checked to be identical to the serial run.
+
+Usage:
+    python benchmarks/bench_parallel.py [--rows 200000] [--workers 1 2 4 8 16]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from corpus import mixed_corpus
+
+from timebench.timebench_eval import TimebenchEval
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    predictions, references, tasks = mixed_corpus(args.rows)
+    baseline = None
+    results = []
+    for num_workers in args.workers:
+        metric = TimebenchEval(num_workers=num_workers, chunk_size=args.chunk_size)
+        # Warm the pool up so that worker start-up is not part of the measurement.
+        metric._compute(predictions[:64], references[:64], tasks[:64])
+        start = time.perf_counter()
+        scores = metric._compute(predictions, references, tasks, return_average=False)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = scores
+        elif scores != baseline:
+            raise AssertionError(f"{num_workers} workers changed the scores")
+        results.append(
+            {
+                "workers": num_workers,
+                "seconds": elapsed,
+                "rows_per_second": args.rows / elapsed,
+                "speedup": results[0]["seconds"] / elapsed if results else 1.0,
+            }
+        )
+        print(
+            f"workers={num_workers:<3} {elapsed:8.3f}s "
+            f"{results[-1]['rows_per_second']:12.0f} rows/s "
+            f"speedup={results[-1]['speedup']:.2f}x"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Startup benchmark: time from a cold ``import timebench_eval`` to the first ``compute``.
+
+Every measurement runs in a fresh interpreter so that module imports and metric
+construction are paid in full, exactly like a cold evaluation worker.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeats 5] [--output startup.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLES = {
+    "TempReason": ("Thus, the correct answer is: Troyes AC.", "Troyes AC"),
+    "TimeQA": ("Thus, the correct answer is: unanswerable", "unanswerable"),
+    "MenatQA": ("Thus, the correct answer is: Cardiff City.", "Cardiff City"),
+    "Date Arithmetic": ("Thus, the correct answer is: August 1804.", "Aug, 1804"),
+    "TimeDial": (
+        "Thus, the correct answer is: B, C.",
+        "B. No more than ten minutes && C. No more than five minutes",
+    ),
+}
+
+_CHILD = """\
+import json, sys, time
+start = time.perf_counter()
+from timebench.timebench_eval import TimebenchEval
+imported = time.perf_counter()
+metric = TimebenchEval()
+constructed = time.perf_counter()
+metric.compute(predictions=[{prediction!r}], references=[{reference!r}], task={task!r})
+computed = time.perf_counter()
+json.dump(
+    {{
+        "import": imported - start,
+        "construct": constructed - imported,
+        "first_compute": computed - constructed,
+        "total": computed - start,
+    }},
+    sys.stdout,
+)
+"""
+
+
+def measure(task: str) -> dict[str, float]:
+    """Run one cold start for ``task`` in a fresh interpreter and return its timings."""
+    prediction, reference = SAMPLES[task]
+    code = _CHILD.format(prediction=prediction, reference=reference, task=task)
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for task in SAMPLES:
+        runs = [measure(task) for _ in range(args.repeats)]
+        results[task] = {
+            stage: statistics.median(run[stage] for run in runs) for stage in runs[0]
+        }
+        print(
+            f"{task:<16} "
+            + "  ".join(f"{stage}={secs:.3f}s" for stage, secs in results[task].items())
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
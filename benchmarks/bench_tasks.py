@@ -0,0 +1,154 @@
+"""Throughput and peak-memory benchmark for every task path.
+
+Measures rows per second and peak traced memory of ``_call_squad``,
+``_compare_dates``, ``_compute_timedial`` and the end-to-end mixed-task
+``compute`` on synthetic corpora (see ``corpus.py``). Results are written as JSON
+tagged with the current git commit so that runs can be compared between commits.
+
+Usage:
+    python benchmarks/bench_tasks.py --sizes 1000 10000 100000 1000000 --output new.json
+    python benchmarks/bench_tasks.py --compare old.json new.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from pathlib import Path
+
+from corpus import date_corpus, mixed_corpus, squad_corpus, timedial_corpus
+
+from timebench.timebench_eval import TimebenchEval
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _targets(metric: TimebenchEval) -> dict:
+    """Map benchmark names to (corpus generator, function scoring that corpus)."""
+    return {
+        "_call_squad": (squad_corpus, metric._call_squad),
+        "_compare_dates": (date_corpus, metric._compare_dates),
+        "_compute_timedial": (timedial_corpus, metric._compute_timedial),
+        "compute": (
+            mixed_corpus,
+            lambda predictions, references, tasks: metric.compute(
+                predictions=predictions, references=references, task=tasks
+            ),
+        ),
+    }
+
+
+def run(name: str, rows: int, repeats: int) -> dict:
+    """Benchmark one target on a corpus of the given size."""
+    metric = TimebenchEval()
+    generate, score = _targets(metric)[name]
+    inputs = generate(rows)
+
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        score(*inputs)
+        timings.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run, tracemalloc slows the scoring down.
+    gc.collect()
+    tracemalloc.start()
+    score(*inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "target": name,
+        "rows": rows,
+        "seconds": best,
+        "rows_per_second": rows / best,
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_commit() -> str | None:
+    """Return the current git commit of the repository, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path: Path, new_path: Path) -> None:
+    """Print the throughput and memory ratios of two result files."""
+    old = json.loads(old_path.read_text())
+    new = json.loads(new_path.read_text())
+    old_results = {(r["target"], r["rows"]): r for r in old["results"]}
+    print(f"{old['commit']} -> {new['commit']}")
+    for result in new["results"]:
+        before = old_results.get((result["target"], result["rows"]))
+        if before is None:
+            continue
+        speed = result["rows_per_second"] / before["rows_per_second"]
+        memory = result["peak_memory_bytes"] / max(before["peak_memory_bytes"], 1)
+        print(
+            f"{result['target']:<18} {result['rows']:>9} rows  "
+            f"throughput x{speed:.2f}  peak memory x{memory:.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument(
+        "--targets",
+        nargs="+",
+        default=["_call_squad", "_compare_dates", "_compute_timedial", "compute"],
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="compare two result files",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = []
+    for name in args.targets:
+        for rows in args.sizes:
+            result = run(name, rows, args.repeats)
+            results.append(result)
+            print(
+                f"{name:<18} {rows:>9} rows  {result['rows_per_second']:>12.0f} rows/s  "
+                f"peak {result['peak_memory_bytes'] / 2**20:>9.1f} MiB"
+            )
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "created": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
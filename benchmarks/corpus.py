@@ -0,0 +1,165 @@
+"""Synthetic Time-Bench corpora for benchmarks.
+
+The generators mimic what reasoning models produce: chain-of-thought of varying
+length (occasionally very long), answers restated several times, a share of
+responses without the answer marker, varied date formats and TimeDial answers
+selecting several options in different notations. All generators are seeded and
+return ``(predictions, references)`` lists.
+"""
+
+import random
+
+from timebench.timebench_core import ANSWER_MARKER
+
+MONTHS = [
+    ("Jan", "January"),
+    ("Feb", "February"),
+    ("Mar", "March"),
+    ("Apr", "April"),
+    ("May", "May"),
+    ("Jun", "June"),
+    ("Jul", "July"),
+    ("Aug", "August"),
+    ("Sep", "September"),
+    ("Oct", "October"),
+    ("Nov", "November"),
+    ("Dec", "December"),
+]
+TEAMS = [
+    "Troyes AC",
+    "Cardiff City",
+    "CD Lugo",
+    "Perugia",
+    "York City",
+    "the University of Oxford",
+    "Deportivo Cali",
+    "S.S. Lazio",
+]
+DURATIONS = ["ten minutes", "five minutes", "two years", "ten months", "an hour"]
+SENTENCES = [
+    "Let's think step by step.",
+    "The context states that the contract was signed in the following season.",
+    "We need to compare the dates given in the question with the timeline.",
+    "Subtracting the years gives the intermediate result.",
+    "However, we must answer based only on the provided context.",
+    "Person1 says they won't be long, implying a short time frame.",
+]
+
+
+def chain_of_thought(rng: random.Random, long_share: float = 0.01) -> str:
+    """Return reasoning text; a small share is around 100 KB long."""
+    sentences = rng.randint(5, 40)
+    if rng.random() < long_share:
+        sentences = rng.randint(1500, 2000)
+    return "\n".join(rng.choice(SENTENCES) for _ in range(sentences))
+
+
+def _respond(rng: random.Random, answer: str) -> str:
+    """Wrap an answer into a model response with typical formatting noise."""
+    reasoning = chain_of_thought(rng)
+    roll = rng.random()
+    if roll < 0.05:
+        return reasoning  # the model never stated a final answer
+    if roll < 0.25:
+        # Repeated marker, sometimes with a different answer first.
+        return (
+            f"{reasoning}\n{ANSWER_MARKER} {rng.choice(TEAMS)}.\n"
+            f"Wait, let me re-check.\n\n{ANSWER_MARKER} {answer}."
+        )
+    if roll < 0.35:
+        return f"{reasoning}\n{ANSWER_MARKER}\n\n{answer}!\nI hope this helps."
+    return f"{reasoning}\n{ANSWER_MARKER} {answer}."
+
+
+def squad_corpus(rows: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    """Corpus for TempReason, TimeQA and MenatQA."""
+    rng = random.Random(seed)
+    predictions, references = [], []
+    for _ in range(rows):
+        reference = "unanswerable" if rng.random() < 0.2 else rng.choice(TEAMS)
+        roll = rng.random()
+        if roll < 0.6:
+            answer = reference
+        elif roll < 0.75:
+            answer = f"[{reference}]"
+        else:
+            answer = rng.choice(TEAMS)
+        predictions.append(_respond(rng, answer))
+        references.append(reference)
+    return predictions, references
+
+
+def _format_date(rng: random.Random, month: int, year: int) -> str:
+    short, long = MONTHS[month - 1]
+    return rng.choice(
+        [
+            f"{short}, {year}",
+            f"{long} {year}",
+            f"{short} {year}",
+            f"{short}. {year}",
+            f"{year}-{month:02d}",
+            f"{month:02d}/{year}",
+            f"the {rng.randint(1, 28)}th of {long} {year}",
+            f"{long} {rng.randint(1, 28)}, {year}",
+        ]
+    )
+
+
+def date_corpus(rows: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    """Corpus for Date Arithmetic."""
+    rng = random.Random(seed)
+    predictions, references = [], []
+    for _ in range(rows):
+        month, year = rng.randint(1, 12), rng.randint(1000, 2030)
+        references.append(f"{MONTHS[month - 1][0]}, {year}")
+        if rng.random() < 0.3:
+            month, year = rng.randint(1, 12), year + rng.randint(-10, 10)
+        predictions.append(_respond(rng, _format_date(rng, month, year)))
+    return predictions, references
+
+
+def timedial_corpus(rows: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    """Corpus for TimeDial."""
+    rng = random.Random(seed)
+    predictions, references = [], []
+    for _ in range(rows):
+        correct = sorted(rng.sample("ABCD", 2))
+        references.append(
+            " && ".join(
+                f"{option}. No more than {rng.choice(DURATIONS)}" for option in correct
+            )
+        )
+        selected = (
+            correct if rng.random() < 0.5 else rng.sample("ABCD", rng.randint(1, 3))
+        )
+        joiner = rng.choice([", ", " and ", " & ", " && "])
+        answer = joiner.join(selected)
+        if rng.random() < 0.2:
+            answer = f"Options {answer}"
+        predictions.append(_respond(rng, answer))
+    return predictions, references
+
+
+def mixed_corpus(rows: int, seed: int = 0) -> tuple[list[str], list[str], list[str]]:
+    """Corpus mixing every task; returns predictions, references and tasks."""
+    rng = random.Random(seed)
+    tasks = [
+        rng.choice(["TempReason", "TimeQA", "MenatQA", "Date Arithmetic", "TimeDial"])
+        for _ in range(rows)
+    ]
+    counts = {task: tasks.count(task) for task in set(tasks)}
+    squad_rows = counts.get("TempReason", 0) + counts.get("TimeQA", 0)
+    squad_rows += counts.get("MenatQA", 0)
+    generated = {
+        "squad": iter(zip(*squad_corpus(squad_rows, seed))),
+        "Date Arithmetic": iter(
+            zip(*date_corpus(counts.get("Date Arithmetic", 0), seed))
+        ),
+        "TimeDial": iter(zip(*timedial_corpus(counts.get("TimeDial", 0), seed))),
+    }
+    predictions, references = [], []
+    for task in tasks:
+        prediction, reference = next(generated.get(task, generated["squad"]))
+        predictions.append(prediction)
+        references.append(reference)
+    return predictions, references, tasks
@@ -152,3 +152,14 @@ PREDICTION_5 = dedent("""\
     A and D are implausible — too long.
 
     Thus, the correct answer is: B, C.""")
+
+# One row of every task type, shared by the mixed-task tests.
+MIXED_PREDICTIONS = [
+    PREDICTION_1,
+    PREDICTION_2,
+    PREDICTION_5,
+    PREDICTION_3,
+    PREDICTION_5,
+]
+MIXED_REFERENCES = ["Troyes AC", "Aug, 1804", "B.", "Cardiff City", "A."]
+MIXED_TASKS = ["TempReason", "Date Arithmetic", "TimeDial", "MenatQA", "TimeDial"]
@@ -1,5 +1,4 @@
 import pytest
-from timebench_eval import TimebenchEval
 from conftest import (
     PREDICTION_1,
     PREDICTION_2,
@@ -8,6 +7,9 @@ from conftest import (
     PREDICTION_5,
 )
 
+from timebench.timebench_core import AnswerExtractor
+from timebench.timebench_eval import TimebenchEval
+
 
 @pytest.mark.parametrize(
     "prediction,extracted_answer",
@@ -21,3 +23,34 @@ from conftest import (
 )
 def test_answer_extraction(prediction, extracted_answer):
     assert TimebenchEval._extract_answer(prediction) == extracted_answer
+
+
+def test_extract_many():
+    extractor = AnswerExtractor()
+    assert extractor.extract_many([PREDICTION_1, PREDICTION_5, "no marker"]) == [
+        "Troyes AC",
+        "B, C",
+        None,
+    ]
+
+
+@pytest.mark.parametrize(
+    "response,extracted_answer",
+    [
+        ("Thus, the correct answer is: A\nFinal answer: B.\nMore text", "B"),
+        ("Final answer: B\nThus, the correct answer is: C", "C"),
+        ("Final answer:\n\n  unanswerable.  ", "unanswerable"),
+        ("Final answer:   \n", None),
+        ("No marker at all", None),
+    ],
+)
+def test_alternative_markers(response, extracted_answer):
+    extractor = AnswerExtractor(["Thus, the correct answer is:", "Final answer:"])
+    assert extractor(response) == extracted_answer
+
+
+def test_long_response_with_repeated_markers():
+    response = "Thus, the correct answer is: A.\n" * 5000 + (
+        "Thus, the correct answer is: B.\n" + "still generating " * 10000
+    )
+    assert TimebenchEval._extract_answer(response) == "B"
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+import pytest
+from conftest import MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+
+from timebench.timebench_async import AsyncEvaluator
+from timebench.timebench_eval import TimebenchEval
+
+
+async def generate(rows, delay=0.0):
+    for row in rows:
+        await asyncio.sleep(delay)
+        yield row
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 64])
+def test_async_result_matches_compute(batch_size):
+    rows = list(zip(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)) * 7
+    evaluator = AsyncEvaluator(batch_size=batch_size, max_pending=2)
+    result = asyncio.run(evaluator.consume(generate(rows)))
+    predictions, references, tasks = (list(column) for column in zip(*rows))
+    assert result == TimebenchEval()._compute(predictions, references, tasks)
+    assert evaluator.rows == len(rows)
+
+
+def test_async_running_aggregates_while_items_arrive():
+    evaluator = AsyncEvaluator(batch_size=100, max_delay=0.01)
+    snapshots = []
+
+    async def slow_items():
+        for row in zip(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS):
+            yield row
+            await asyncio.sleep(0.1)
+            snapshots.append(evaluator.rows)
+
+    asyncio.run(evaluator.consume(slow_items()))
+    # Partial batches are scored after max_delay, long before the batch is full.
+    assert snapshots == [1, 2, 3, 4, 5]
+    assert evaluator.result()["per_task"].keys() == set(MIXED_TASKS)
+
+
+def test_async_without_items():
+    with pytest.raises(ValueError, match="no rows"):
+        asyncio.run(AsyncEvaluator().consume(generate([])))
+
+
+def test_async_scores_batches_on_one_thread():
+    metric = TimebenchEval()
+    threads = set()
+    score_rows = metric.score_rows
+
+    def record_thread(*args):
+        threads.add(threading.get_ident())
+        return score_rows(*args)
+
+    metric.score_rows = record_thread
+    evaluator = AsyncEvaluator(metric, batch_size=1, max_pending=4)
+    rows = list(zip(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)) * 4
+    asyncio.run(evaluator.consume(generate(rows)))
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
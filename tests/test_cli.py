@@ -0,0 +1,79 @@
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from conftest import MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+
+from timebench.timebench_cli import main
+from timebench.timebench_eval import TimebenchEval
+
+
+@pytest.fixture
+def prediction_files(tmp_path):
+    rows = [
+        {"prediction": prediction, "reference": reference, "task": task}
+        for prediction, reference, task in zip(
+            MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+        )
+    ]
+    jsonl = tmp_path / "first.jsonl"
+    jsonl.write_text("\n".join(json.dumps(row) for row in rows[:2]) + "\n")
+    parquet = tmp_path / "second.parquet"
+    pq.write_table(pa.Table.from_pylist(rows[2:]), parquet)
+    return [str(jsonl), str(parquet)]
+
+
+def test_cli_matches_compute(prediction_files, tmp_path):
+    output = tmp_path / "scores.json"
+    samples = tmp_path / "samples.jsonl"
+    exit_code = main(
+        [
+            *prediction_files,
+            "--task-column",
+            "task",
+            "--batch-size",
+            "2",
+            "--output",
+            str(output),
+            "--samples",
+            str(samples),
+            "--quiet",
+        ]
+    )
+    assert exit_code == 0
+
+    report = json.loads(output.read_text())
+    expected = TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+    )
+    assert {key: report[key] for key in expected} == expected
+    assert report["rows"] == len(MIXED_PREDICTIONS)
+
+    per_sample = TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, return_average=False
+    )
+    lines = [json.loads(line) for line in samples.read_text().splitlines()]
+    assert [(line["file"], line["row"]) for line in lines] == [
+        (prediction_files[0], 0),
+        (prediction_files[0], 1),
+        (prediction_files[1], 0),
+        (prediction_files[1], 1),
+        (prediction_files[1], 2),
+    ]
+    assert [line["task"] for line in lines] == MIXED_TASKS
+    assert [line["exact_match"] for line in lines] == per_sample["exact_match"]
+    assert [line.get("f1") for line in lines] == per_sample["f1"]
+
+
+def test_cli_single_task(prediction_files, capsys):
+    assert main([prediction_files[0], "--task", "TempReason", "--quiet"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["exact_match"] == 0.5
+    assert report["per_task"].keys() == {"TempReason"}
+
+
+def test_cli_without_rows(tmp_path):
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("")
+    assert main([str(empty), "--task", "TimeQA", "--quiet"]) == 1
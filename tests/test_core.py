@@ -0,0 +1,79 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from conftest import PREDICTION_1, PREDICTION_2, PREDICTION_3, PREDICTION_5
+
+from timebench import timebench_core
+from timebench.timebench_core import OptionExtractor, option_mask_scores, score_task
+
+CASES = {
+    "TempReason": ([PREDICTION_1, PREDICTION_3], ["Troyes AC", "Lazio"]),
+    "TimeQA": ([PREDICTION_3, PREDICTION_1], ["unanswerable", "Perugia"]),
+    "Date Arithmetic": (
+        [PREDICTION_2, PREDICTION_2, "no answer", "Thus, the correct answer is: 1804"],
+        ["Aug, 1804", "Sep, 1804", "not a date", "Jan, 1804"],
+    ),
+    "TimeDial": (
+        [PREDICTION_5, PREDICTION_5, "no answer", PREDICTION_1],
+        ["B, C", "B. ten minutes", "", "A"],
+    ),
+}
+
+
+def test_core_imports_without_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "from timebench import timebench_core\n"
+        "heavy = {'evaluate', 'datasets', 'numpy', 'pyarrow'} & set(sys.modules)\n"
+        "assert not heavy, heavy\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).parent.parent, check=True
+    )
+
+
+@pytest.mark.parametrize("task", CASES)
+def test_score_task_matches_metric(task):
+    predictions, references = CASES[task]
+    expected = timebench_core.TimebenchEval()._compute(
+        predictions, references, task, return_average=False
+    )
+    assert score_task(predictions, references, task) == expected
+
+
+def test_score_task_with_custom_options():
+    predictions = ["Thus, the correct answer is: B and F."]
+    scores = score_task(
+        predictions, ["F"], "TimeDial", option_extractor=OptionExtractor("ABCDEF")
+    )
+    assert scores == {"exact_match": [0], "f1": [2 / 3]}
+
+
+def test_option_mask_scores_match_set_based_scores():
+    pred_masks = [mask for mask in range(16) for _ in range(16)]
+    ref_masks = list(range(16)) * 16
+    exact_matches, f1_scores = option_mask_scores(pred_masks, ref_masks)
+    for pred_mask, ref_mask, em, f1 in zip(
+        pred_masks, ref_masks, exact_matches, f1_scores
+    ):
+        if not pred_mask and not ref_mask:
+            expected = 1.0
+        elif not pred_mask & ref_mask:
+            expected = 0.0
+        else:
+            precision = (pred_mask & ref_mask).bit_count() / pred_mask.bit_count()
+            recall = (pred_mask & ref_mask).bit_count() / ref_mask.bit_count()
+            expected = 2 * precision * recall / (precision + recall)
+        assert em == (pred_mask == ref_mask)
+        assert f1 == expected
+
+
+def test_score_task_validation():
+    with pytest.raises(ValueError, match="same length"):
+        score_task(["a"], [], "TimeQA")
+    with pytest.raises(ValueError, match="Unknown task"):
+        score_task(["a"], ["a"], "TimeBench")
+    with pytest.raises(AttributeError):
+        timebench_core.Missing  # noqa: B018
@@ -1,12 +1,33 @@
-from timebench_eval import TimebenchEval
+import json
+
+import datasets
+import evaluate
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from conftest import (
+    MIXED_PREDICTIONS,
+    MIXED_REFERENCES,
+    MIXED_TASKS,
     PREDICTION_1,
     PREDICTION_2,
     PREDICTION_3,
     PREDICTION_4,
     PREDICTION_5,
 )
+from dateutil import parser
+from dateutil.parser import ParserError
+from pyarrow import feather
+
+from timebench.timebench_bootstrap import (
+    bootstrap_confidence_interval,
+    paired_bootstrap_test,
+)
+from timebench.timebench_core import OptionExtractor, option_mask_scores, squad_scores
+from timebench.timebench_eval import TimebenchEval, timedial_scores
+from timebench.timebench_index import ReferenceIndex
+from timebench.timebench_scores import merge_task_scores
 
 
 @pytest.mark.parametrize(
@@ -94,3 +115,705 @@ def test_eval_many():
         "exact_match": [1, 1],
         "f1": [1, 1],
     }
+
+
+@pytest.fixture(scope="module")
+def squad_metric():
+    try:
+        return evaluate.load("squad")
+    except (FileNotFoundError, ConnectionError) as e:
+        pytest.skip(f"squad metric is not available: {e}")
+
+
+@pytest.mark.parametrize(
+    "prediction",
+    [PREDICTION_1, PREDICTION_2, PREDICTION_3, PREDICTION_4, PREDICTION_5],
+)
+@pytest.mark.parametrize(
+    "reference",
+    [
+        "Troyes AC",
+        "the Troyes A.C.",
+        "Aug, 1804",
+        "unanswerable",
+        "Cardiff City and York City",
+        "B. No more than ten minutes && C. No more than five minutes",
+        "",
+    ],
+)
+def test_squad_scores_match_squad_metric(squad_metric, prediction, reference):
+    answer = TimebenchEval._extract_answer(prediction) or ""
+    expected = squad_metric.compute(
+        predictions=[{"id": "0", "prediction_text": answer}],
+        references=[{"id": "0", "answers": {"text": [reference], "answer_start": [0]}}],
+    )
+    exact_matches, f1_scores = squad_scores([answer], [reference])
+    assert exact_matches == [expected["exact_match"] / 100]
+    assert f1_scores == [expected["f1"] / 100]
+
+
+def test_squad_scores():
+    exact_matches, f1_scores = squad_scores(
+        ["The Troyes AC!", "Cardiff", "", "an"],
+        ["troyes  AC", "Cardiff City", "Cardiff City", "the"],
+    )
+    assert exact_matches == [1.0, 0.0, 0.0, 1.0]
+    assert f1_scores == [1.0, pytest.approx(2 / 3), 0.0, 0.0]
+
+
+def test_squad_tasks_do_not_load_hub_modules(monkeypatch):
+
+    def offline_load(*args, **kwargs):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(evaluate, "load", offline_load)
+    metrics = TimebenchEval()._compute([PREDICTION_1], ["Troyes AC"], "TempReason")
+    assert metrics == {"exact_match": 1.0, "f1": 1.0}
+
+
+@pytest.mark.parametrize(
+    "date_str",
+    [
+        "Aug, 1987",
+        "August 1804",
+        "Jan 2020",
+        "sept. 2021",
+        "MAY,1999",
+        "Aug 987",
+        "Febr 2020",
+        "25 February 1993",
+        "1987",
+        "unanswerable",
+    ],
+)
+def test_parse_historical_date_matches_dateutil(date_str):
+    try:
+        expected = parser.parse(date_str).replace(day=1)
+    except ParserError:
+        expected = None
+    assert TimebenchEval._parse_historical_date(date_str) == expected
+
+
+def test_date_cache_info():
+    metric = TimebenchEval(date_cache_size=2)
+    # Repeats within a batch are parsed once; the cache serves later batches.
+    for _ in range(2):
+        metric._compute(
+            [PREDICTION_2, PREDICTION_2], ["Aug, 1804", "Aug, 1804"], "Date Arithmetic"
+        )
+    info = metric.date_cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (2, 2, 2, 2)
+
+
+def test_streaming_matches_batch():
+    predictions = [PREDICTION_1, PREDICTION_3, PREDICTION_4] * 5
+    references = ["Troyes AC", "unanswerable", "Troyes AC"] * 5
+    expected = TimebenchEval()._compute(predictions, references, "TempReason")
+
+    metric = TimebenchEval(streaming=True)
+    for start in range(0, len(predictions), 4):
+        metric.add_batch(
+            predictions=predictions[start : start + 4],
+            references=references[start : start + 4],
+            task="TempReason",
+        )
+    assert metric.compute() == expected
+    assert metric._running == {}
+
+
+def test_streaming_keep_samples():
+    metric = TimebenchEval(streaming=True, keep_samples=True)
+    metric.add(prediction=PREDICTION_5, reference="B.", task="TimeDial")
+    metric.add(prediction=PREDICTION_2, reference="Aug, 1804", task="Date Arithmetic")
+    assert metric.compute(task="TimeDial", return_average=False) == {
+        "exact_match": [0],
+        "f1": [pytest.approx(2 / 3)],
+    }
+
+
+def test_streaming_requires_keep_samples_for_per_sample_scores():
+    metric = TimebenchEval(streaming=True)
+    metric.add_batch(predictions=[PREDICTION_5], references=["B."], task="TimeDial")
+    with pytest.raises(ValueError, match="keep_samples"):
+        metric.compute(return_average=False)
+
+
+def test_mixed_tasks_per_sample():
+    metrics = TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, return_average=False
+    )
+    assert metrics == {
+        "exact_match": [1, 1, 0, 0, 0],
+        "f1": [1, None, pytest.approx(2 / 3), 0, 0],
+        "per_task": {
+            "TempReason": {"exact_match": [1], "f1": [1]},
+            "Date Arithmetic": {"exact_match": [1]},
+            "TimeDial": {"exact_match": [0, 0], "f1": [pytest.approx(2 / 3), 0]},
+            "MenatQA": {"exact_match": [0], "f1": [0]},
+        },
+    }
+
+
+def test_mixed_tasks_average():
+    metric = TimebenchEval()
+    metrics = metric._compute(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)
+    assert metrics["exact_match"] == pytest.approx(2 / 5)
+    assert metrics["f1"] == pytest.approx((1 + 2 / 3) / 4)
+    for task in set(MIXED_TASKS):
+        rows = [i for i, row_task in enumerate(MIXED_TASKS) if row_task == task]
+        assert metrics["per_task"][task] == metric._compute(
+            [MIXED_PREDICTIONS[i] for i in rows],
+            [MIXED_REFERENCES[i] for i in rows],
+            task,
+        )
+
+
+def test_mixed_tasks_streaming():
+    metric = TimebenchEval(streaming=True)
+    metric.add_batch(
+        predictions=MIXED_PREDICTIONS[:2],
+        references=MIXED_REFERENCES[:2],
+        task=MIXED_TASKS[:2],
+    )
+    metric.add_batch(
+        predictions=MIXED_PREDICTIONS[2:],
+        references=MIXED_REFERENCES[2:],
+        task=MIXED_TASKS[2:],
+    )
+    expected = TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+    )
+    assert metric.compute() == expected
+
+
+def test_mixed_tasks_empty():
+    with pytest.raises(ValueError, match="cannot be empty"):
+        TimebenchEval().compute(predictions=[], references=[], task=[])
+
+
+def test_mixed_tasks_length_mismatch():
+    with pytest.raises(ValueError, match="one entry per prediction"):
+        TimebenchEval()._compute([PREDICTION_1], ["Troyes AC"], ["TempReason"] * 2)
+
+
+def test_parallel_scoring_matches_serial():
+    predictions = MIXED_PREDICTIONS * 7
+    references = MIXED_REFERENCES * 7
+    tasks = MIXED_TASKS * 7
+    serial = TimebenchEval()._compute(
+        predictions, references, tasks, return_average=False
+    )
+    parallel = TimebenchEval(num_workers=2, chunk_size=3)._compute(
+        predictions, references, tasks, return_average=False
+    )
+    assert parallel == serial
+
+
+def test_diagnostics():
+    metrics = TimebenchEval()._compute(
+        MIXED_PREDICTIONS + ["no marker", "Thus, the correct answer is: soon"],
+        MIXED_REFERENCES + ["Troyes AC", "Aug, 1804"],
+        MIXED_TASKS + ["TimeQA", "Date Arithmetic"],
+        diagnostics=True,
+    )
+    assert set(metrics["diagnostics"]["timings"]) == {
+        "extraction",
+        "parsing",
+        "scoring",
+        "aggregation",
+    }
+    assert metrics["diagnostics"]["counters"] == {
+        "extraction_misses": 1,
+        "parse_failures": 1,
+        "empty_option_sets": 0,
+        "unanswerable": 1,
+        "answers": 7,
+        "unique_answers": 6,
+        "references": 7,
+        "unique_references": 6,
+    }
+    assert metrics["diagnostics"]["dedup_ratio"] == 14 / 12
+    assert "diagnostics" not in TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+    )
+
+
+def test_diagnostics_parallel_and_streaming_match_serial():
+    predictions = MIXED_PREDICTIONS * 3
+    references = MIXED_REFERENCES * 3
+    tasks = MIXED_TASKS * 3
+    serial = TimebenchEval()._compute(predictions, references, tasks, diagnostics=True)
+    parallel = TimebenchEval(num_workers=2, chunk_size=2)._compute(
+        predictions, references, tasks, diagnostics=True
+    )
+    metric = TimebenchEval(streaming=True)
+    metric.add_batch(
+        predictions=predictions, references=references, task=tasks, diagnostics=True
+    )
+    streamed = metric.compute()
+    assert streamed["diagnostics"] == serial["diagnostics"] | {
+        "timings": streamed["diagnostics"]["timings"]
+    }
+    # Workers deduplicate within their chunks only, so they find fewer repeats.
+    counters = parallel["diagnostics"]["counters"]
+    for name, value in serial["diagnostics"]["counters"].items():
+        if name.startswith("unique_"):
+            assert counters[name] >= value
+        else:
+            assert counters[name] == value
+
+
+@pytest.fixture
+def mixed_table():
+    return pa.table(
+        {
+            "prediction": MIXED_PREDICTIONS,
+            "reference": MIXED_REFERENCES,
+            "task": MIXED_TASKS,
+        }
+    )
+
+
+@pytest.mark.parametrize("return_average", [True, False])
+@pytest.mark.parametrize(
+    "source_type", ["table", "dataset", "parquet", "arrow", "jsonl"]
+)
+def test_columnar_sources(mixed_table, tmp_path, source_type, return_average):
+    if source_type == "table":
+        source = mixed_table
+    elif source_type == "dataset":
+        source = datasets.Dataset(mixed_table)
+    elif source_type == "parquet":
+        source = tmp_path / "predictions.parquet"
+        pq.write_table(mixed_table, source)
+    elif source_type == "arrow":
+        source = tmp_path / "predictions.arrow"
+        feather.write_feather(mixed_table, source)
+    else:
+        source = tmp_path / "predictions.jsonl"
+        source.write_text(
+            "\n".join(json.dumps(row) for row in mixed_table.to_pylist()) + "\n"
+        )
+
+    metrics = TimebenchEval().compute(
+        predictions=source,
+        task_column="task",
+        batch_size=2,
+        return_average=return_average,
+    )
+    expected = TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, return_average
+    )
+    assert metrics == expected
+
+
+def test_column_arrays():
+    predictions = [PREDICTION_1, PREDICTION_3, PREDICTION_4]
+    references = ["Troyes AC", "unanswerable", "Troyes AC"]
+    expected = TimebenchEval()._compute(predictions, references, "TimeQA")
+    for columns in (
+        (pa.array(predictions), pa.chunked_array([references[:1], references[1:]])),
+        (np.array(predictions), np.array(references)),
+    ):
+        metrics = TimebenchEval().compute(
+            predictions=columns[0], references=columns[1], task="TimeQA", batch_size=2
+        )
+        assert metrics == expected
+
+
+@pytest.mark.parametrize("return_average", [True, False])
+def test_columnar_sources_with_task_list(mixed_table, return_average):
+    predictions = MIXED_PREDICTIONS * 3
+    references = MIXED_REFERENCES * 3
+    tasks = MIXED_TASKS * 3
+    expected = TimebenchEval()._compute(predictions, references, tasks, return_average)
+    for source, columns in (
+        (pa.concat_tables([mixed_table] * 3), {}),
+        (pa.array(predictions), {"references": pa.array(references)}),
+    ):
+        metrics = TimebenchEval().compute(
+            predictions=source,
+            task=tasks,
+            batch_size=4,
+            return_average=return_average,
+            **columns,
+        )
+        assert metrics == expected
+    with pytest.raises(ValueError, match="one entry per prediction, got 16 and 15"):
+        TimebenchEval().compute(
+            predictions=pa.concat_tables([mixed_table] * 3),
+            task=tasks + ["TimeQA"],
+            batch_size=4,
+        )
+
+
+def test_columnar_source_in_streaming_mode(mixed_table):
+    metric = TimebenchEval(streaming=True)
+    metric.add_batch(predictions=mixed_table, task_column="task")
+    assert metric.compute() == TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+    )
+
+
+def test_bootstrap_confidence_interval_matches_index_resampling():
+    rng = np.random.default_rng(0)
+    scores = rng.choice([0.0, 0.5, 1.0], size=2000, p=[0.3, 0.2, 0.5])
+    indices = rng.integers(0, len(scores), size=(4000, len(scores)))
+    expected = np.quantile(scores[indices].mean(axis=1), [0.025, 0.975])
+    low, high = bootstrap_confidence_interval(scores, 4000, seed=1)
+    assert low == pytest.approx(expected[0], abs=0.005)
+    assert high == pytest.approx(expected[1], abs=0.005)
+    assert bootstrap_confidence_interval(scores, 100, seed=1) == (
+        bootstrap_confidence_interval(scores, 100, seed=1)
+    )
+
+
+@pytest.mark.parametrize("return_average", [True, False])
+def test_compute_with_confidence_intervals(return_average):
+    metric = TimebenchEval()
+    predictions = MIXED_PREDICTIONS * 20
+    references = MIXED_REFERENCES * 20
+    tasks = MIXED_TASKS * 20
+    metrics = metric._compute(
+        predictions,
+        references,
+        tasks,
+        return_average,
+        bootstrap_resamples=200,
+        bootstrap_seed=0,
+    )
+    intervals = metrics.pop("confidence_intervals")
+    assert metrics == metric._compute(predictions, references, tasks, return_average)
+    assert intervals.keys() == {"exact_match", "f1", "per_task"}
+    assert intervals["per_task"].keys() == set(MIXED_TASKS)
+    assert intervals["per_task"]["Date Arithmetic"].keys() == {"exact_match"}
+    averages = metric._compute(predictions, references, tasks)
+    for key in ("exact_match", "f1"):
+        low, high = intervals[key]
+        assert low <= averages[key] <= high
+
+
+def test_streaming_confidence_intervals_match_batch():
+    metric = TimebenchEval(streaming=True, keep_samples=True)
+    for prediction, reference, task in zip(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+    ):
+        metric.add(prediction=prediction, reference=reference, task=task)
+    metrics = metric.compute(bootstrap_resamples=100, bootstrap_seed=0)
+    expected = TimebenchEval()._compute(
+        MIXED_PREDICTIONS,
+        MIXED_REFERENCES,
+        MIXED_TASKS,
+        bootstrap_resamples=100,
+        bootstrap_seed=0,
+    )
+    assert metrics == expected
+
+    metric = TimebenchEval(streaming=True)
+    metric.add_batch(predictions=[PREDICTION_1], references=["x"], task="TimeQA")
+    with pytest.raises(ValueError, match="keep_samples"):
+        metric.compute(bootstrap_resamples=100)
+
+
+def test_paired_test():
+    metric = TimebenchEval()
+    predictions = MIXED_PREDICTIONS * 20
+    references = MIXED_REFERENCES * 20
+    tasks = MIXED_TASKS * 20
+    same = metric.paired_test(predictions, predictions, references, tasks, 500, seed=0)
+    assert same["exact_match"]["difference"] == 0.0
+    assert same["exact_match"]["p_value"] == 1.0
+    assert same["per_task"]["Date Arithmetic"].keys() == {"exact_match"}
+
+    worse = ["Thus, the correct answer is: nothing"] * len(predictions)
+    result = metric.paired_test(predictions, worse, references, tasks, 500, seed=0)
+    averages = metric._compute(predictions, references, tasks)
+    assert result["exact_match"]["difference"] == pytest.approx(averages["exact_match"])
+    assert result["exact_match"]["p_value"] < 0.01
+    low, high = result["f1"]["confidence_interval"]
+    assert 0 < low <= result["f1"]["difference"] <= high
+
+
+def test_paired_bootstrap_test_length_mismatch():
+    with pytest.raises(ValueError, match="same length"):
+        paired_bootstrap_test([1.0, 0.0], [1.0])
+
+
+@pytest.mark.parametrize("return_average", [True, False])
+def test_reference_index_matches_raw_references(tmp_path, return_average):
+    predictions = MIXED_PREDICTIONS + [
+        "Thus, the correct answer is: Aug 1987",
+        "Thus, the correct answer is: nonsense",
+        "Thus, the correct answer is: B",
+    ]
+    references = MIXED_REFERENCES + ["Aug 1987 10:30", "no date", ""]
+    tasks = MIXED_TASKS + ["Date Arithmetic", "Date Arithmetic", "TimeDial"]
+    ReferenceIndex.build(references, tasks).save(tmp_path / "references.arrow")
+    index = ReferenceIndex.load(tmp_path / "references.arrow")
+    assert len(index) == len(references)
+
+    metric = TimebenchEval()
+    expected = metric._compute(predictions, references, tasks, return_average)
+    assert (
+        metric.compute(
+            predictions=predictions, references=index, return_average=return_average
+        )
+        == expected
+    )
+
+
+def test_reference_index_single_task():
+    references = ["Troyes AC", "unanswerable", "Troyes AC"]
+    predictions = [PREDICTION_1, PREDICTION_3, PREDICTION_4]
+    index = ReferenceIndex.build(references, "TimeQA")
+    metric = TimebenchEval()
+    assert metric.compute(
+        predictions=predictions, references=index, task="TimeQA"
+    ) == metric._compute(predictions, references, "TimeQA")
+    assert metric.compute(predictions=predictions, references=index) == (
+        metric._compute(predictions, references, "TimeQA")
+    )
+    with pytest.raises(ValueError, match="not all of task"):
+        metric.compute(predictions=predictions, references=index, task="TimeDial")
+
+
+def test_reference_index_in_streaming_mode():
+    metric = TimebenchEval(streaming=True)
+    for rows in (slice(0, 2), slice(2, 4)):
+        metric.add_batch(
+            predictions=MIXED_PREDICTIONS[rows],
+            references=ReferenceIndex.build(MIXED_REFERENCES[rows], MIXED_TASKS[rows]),
+        )
+    assert metric.compute(
+        predictions=MIXED_PREDICTIONS[4:],
+        references=ReferenceIndex.build(MIXED_REFERENCES[4:], MIXED_TASKS[4:]),
+    ) == TimebenchEval()._compute(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)
+
+    single = ReferenceIndex.build(MIXED_REFERENCES, "TempReason")
+    assert metric.compute(
+        predictions=MIXED_PREDICTIONS, references=single, task="TempReason"
+    ) == TimebenchEval()._compute(MIXED_PREDICTIONS, MIXED_REFERENCES, "TempReason")
+
+
+def test_reference_index_leaves_incomplete_dates_to_scoring_time():
+    references = ["1987", "August", "Aug, 1804"]
+    index = ReferenceIndex.build(references, "Date Arithmetic")
+    assert index.table.column("month").to_pylist() == [None, None, 1804 * 12 + 7]
+
+
+def test_reference_index_rejects_other_versions():
+    table = ReferenceIndex.build(["B."], "TimeDial").table
+    with pytest.raises(ValueError, match="version"):
+        ReferenceIndex(table.replace_schema_metadata({}))
+
+
+def test_compare_systems():
+    systems = {
+        "first": MIXED_PREDICTIONS,
+        "second": MIXED_PREDICTIONS[::-1],
+    }
+    metric = TimebenchEval()
+    comparison = metric.compare_systems(
+        systems, MIXED_REFERENCES, MIXED_TASKS, return_samples=True
+    )
+    assert comparison["systems"] == ["first", "second"]
+    for row, (name, predictions) in enumerate(systems.items()):
+        assert comparison["scores"][name] == metric._compute(
+            predictions, MIXED_REFERENCES, MIXED_TASKS
+        )
+        per_sample = metric._compute(
+            predictions, MIXED_REFERENCES, MIXED_TASKS, return_average=False
+        )
+        for key in ("exact_match", "f1"):
+            expected = np.array(per_sample[key], dtype=np.float64)
+            np.testing.assert_array_equal(comparison["samples"][key][row], expected)
+
+    index = ReferenceIndex.build(MIXED_REFERENCES[:1], "TempReason")
+    single = metric.compare_systems(
+        {"only": MIXED_PREDICTIONS[:1]}, index, "TempReason"
+    )
+    assert single["scores"]["only"] == {"exact_match": 1.0, "f1": 1.0}
+    assert "samples" not in single
+
+
+def test_option_extractor():
+    extractor = OptionExtractor()
+    assert extractor.mask("B. ten minutes && D. an hour") == 0b1010
+    assert extractor.options("Options B and C") == {"B", "C"}
+    assert extractor.masks(["A", None, "", "E"]) == [1, 0, 0, 0]
+    with pytest.raises(ValueError, match="distinct"):
+        OptionExtractor("ABA")
+
+
+def test_timedial_scores_match_option_mask_scores():
+    masks = np.arange(16, dtype=np.uint8)
+    pred_masks, ref_masks = np.repeat(masks, 16), np.tile(masks, 16)
+    exact_matches, f1_scores = timedial_scores(pred_masks, ref_masks)
+    expected_matches, expected_f1 = option_mask_scores(
+        pred_masks.tolist(), ref_masks.tolist()
+    )
+    assert exact_matches.tolist() == expected_matches
+    assert f1_scores.tolist() == expected_f1
+
+
+def test_custom_option_letters():
+    metric = TimebenchEval(option_letters="ABCDEF")
+    predictions = ["Thus, the correct answer is: B, F."]
+    assert metric._compute(predictions, ["B, F"], "TimeDial") == {
+        "exact_match": 1.0,
+        "f1": 1.0,
+    }
+    assert TimebenchEval()._compute(predictions, ["B, E"], "TimeDial")["f1"] == 1.0
+    assert metric._compute(predictions, ["B, E"], "TimeDial")["f1"] == 0.5
+    index = ReferenceIndex.build(["B, F"], "TimeDial", option_letters="ABCDEF")
+    assert metric._compute(predictions, index, "TimeDial")["exact_match"] == 1.0
+    with pytest.raises(ValueError, match="option letters"):
+        TimebenchEval()._compute(predictions, index, "TimeDial")
+
+
+@pytest.mark.parametrize("source", ["lists", "table"])
+def test_numpy_sample_format(mixed_table, source):
+    metric = TimebenchEval()
+    expected = metric._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, return_average=False
+    )
+    if source == "lists":
+        samples = metric._compute(
+            MIXED_PREDICTIONS,
+            MIXED_REFERENCES,
+            MIXED_TASKS,
+            return_average=False,
+            sample_format="numpy",
+        )
+    else:
+        samples = metric.compute(
+            predictions=mixed_table,
+            task_column="task",
+            batch_size=2,
+            return_average=False,
+            sample_format="numpy",
+        )
+    assert samples["exact_match"].dtype == np.uint8
+    assert samples["f1"].dtype == np.float32
+    assert samples["exact_match"].tolist() == expected["exact_match"]
+    np.testing.assert_allclose(
+        samples["f1"], [np.nan if f1 is None else f1 for f1 in expected["f1"]]
+    )
+    for task, scores in expected["per_task"].items():
+        for key, values in scores.items():
+            np.testing.assert_allclose(samples["per_task"][task][key], values, 1e-7)
+
+
+def test_arrow_sample_format():
+    samples = TimebenchEval()._compute(
+        MIXED_PREDICTIONS,
+        MIXED_REFERENCES,
+        MIXED_TASKS,
+        return_average=False,
+        sample_format="arrow",
+    )["samples"]
+    assert samples.column_names == ["row", "task", "exact_match", "f1"]
+    assert samples.column("row").to_pylist() == list(range(len(MIXED_TASKS)))
+    assert samples.column("task").to_pylist() == MIXED_TASKS
+    assert samples.column("f1").null_count == MIXED_TASKS.count("Date Arithmetic")
+
+
+def test_averages_from_arrays():
+    metric = TimebenchEval()
+    assert metric._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, sample_format="numpy"
+    ) == metric._compute(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)
+    with pytest.raises(ValueError, match="sample_format"):
+        metric._compute(
+            MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, sample_format="csv"
+        )
+
+
+@pytest.mark.parametrize("return_average", [True, False])
+def test_group_by_matches_filtered_compute(return_average):
+    metric = TimebenchEval()
+    levels = ["L1", "L2", "L3", "L1", "L2"]
+    variants = [index % 2 for index in range(len(MIXED_TASKS))]
+    output = metric._compute(
+        MIXED_PREDICTIONS,
+        MIXED_REFERENCES,
+        MIXED_TASKS,
+        return_average=return_average,
+        group_by={"level": levels, "variant": variants},
+    )
+    per_group = output.pop("per_group")
+    assert output == metric._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, return_average
+    )
+    for name, keys in {"level": levels, "variant": variants}.items():
+        assert per_group[name].keys() == set(keys)
+        for key, scores in per_group[name].items():
+            rows = [index for index, row_key in enumerate(keys) if row_key == key]
+            expected = metric._compute(
+                [MIXED_PREDICTIONS[i] for i in rows],
+                [MIXED_REFERENCES[i] for i in rows],
+                [MIXED_TASKS[i] for i in rows],
+            )
+            expected.pop("per_task")
+            assert scores == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("return_average", [True, False])
+def test_score_rows_merge_like_compute(return_average):
+    metric = TimebenchEval()
+    grouped = metric.score_rows(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)
+    assert merge_task_scores(
+        grouped, len(MIXED_PREDICTIONS), return_average
+    ) == metric._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, return_average
+    )
+    single = metric.score_rows(MIXED_PREDICTIONS, MIXED_REFERENCES, "TimeQA")
+    assert single == {
+        "TimeQA": (
+            list(range(len(MIXED_PREDICTIONS))),
+            metric._compute(
+                MIXED_PREDICTIONS, MIXED_REFERENCES, "TimeQA", return_average=False
+            ),
+        )
+    }
+
+
+def test_group_by_single_task():
+    metric = TimebenchEval()
+    output = metric.compute(
+        predictions=MIXED_PREDICTIONS,
+        references=MIXED_REFERENCES,
+        task="TempReason",
+        group_by=["a", "b", "a", "b", "a"],
+    )
+    assert output["per_group"]["b"] == metric.compute(
+        predictions=MIXED_PREDICTIONS[1::2],
+        references=MIXED_REFERENCES[1::2],
+        task="TempReason",
+    )
+    with pytest.raises(ValueError, match="one key per prediction"):
+        metric._compute(
+            MIXED_PREDICTIONS, MIXED_REFERENCES, "TempReason", group_by=["a"]
+        )
+    table = pa.table({"prediction": MIXED_PREDICTIONS, "reference": MIXED_REFERENCES})
+    with pytest.raises(ValueError, match="only supported for in-memory"):
+        metric.compute(predictions=table, task="TempReason", group_by=["a"] * 5)
+
+
+@pytest.mark.parametrize("task", ["TimeQA", "Date Arithmetic", "TimeDial"])
+def test_deduplicated_scores_match_row_by_row(task):
+    metric = TimebenchEval()
+    predictions = MIXED_PREDICTIONS * 4
+    references = MIXED_REFERENCES[::-1] * 4
+    output = metric._compute(
+        predictions, references, task, return_average=False, diagnostics=True
+    )
+    rows = [
+        metric._compute([prediction], [reference], task, return_average=False)
+        for prediction, reference in zip(predictions, references)
+    ]
+    for key in rows[0]:
+        assert output[key] == [row[key][0] for row in rows]
+    counters = output["diagnostics"]["counters"]
+    assert counters["unique_references"] == len(set(references))
+    assert output["diagnostics"]["dedup_ratio"] > 3
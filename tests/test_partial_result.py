@@ -0,0 +1,64 @@
+import pytest
+from conftest import (
+    MIXED_PREDICTIONS,
+    MIXED_REFERENCES,
+    MIXED_TASKS,
+    PREDICTION_1,
+    PREDICTION_3,
+)
+
+from timebench.timebench_eval import TimebenchEval
+from timebench.timebench_partial import PartialResult, merge_partials
+
+
+def shards(rows, world_size):
+    size = -(-len(rows) // world_size)
+    return [rows[start : start + size] for start in range(0, len(rows), size)]
+
+
+@pytest.mark.parametrize("world_size", [1, 2, 3, 5])
+def test_merged_partials_match_compute(world_size):
+    metric = TimebenchEval()
+    rows = list(zip(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)) * 3
+    partials = []
+    for shard in shards(rows, world_size):
+        predictions, references, tasks = (list(column) for column in zip(*shard))
+        partial = metric.partial(predictions, references, tasks)
+        partials.append(PartialResult.from_bytes(partial.to_bytes()))
+    predictions, references, tasks = (list(column) for column in zip(*rows))
+    assert merge_partials(partials).result() == metric._compute(
+        predictions, references, tasks
+    )
+    assert merge_partials(partials).rows == len(rows)
+
+
+def test_merge_is_associative():
+    metric = TimebenchEval()
+    first, second, third = (
+        metric.partial(
+            MIXED_PREDICTIONS[start:stop],
+            MIXED_REFERENCES[start:stop],
+            MIXED_TASKS[start:stop],
+        )
+        for start, stop in ((0, 2), (2, 3), (3, 5))
+    )
+    left = merge_partials([merge_partials([first, second]), third])
+    right = merge_partials([first, merge_partials([second, third])])
+    assert left.to_bytes() == right.to_bytes()
+
+
+def test_per_sample_shards_in_rank_order():
+    metric = TimebenchEval()
+    predictions = [PREDICTION_1, PREDICTION_3, PREDICTION_1]
+    references = ["Troyes AC", "unanswerable", "Cardiff City"]
+    partials = [
+        metric.partial(predictions[:2], references[:2], "TimeQA", keep_samples=True),
+        metric.partial([], [], "TimeQA", keep_samples=True),
+        metric.partial(predictions[2:], references[2:], "TimeQA", keep_samples=True),
+    ]
+    merged = merge_partials(PartialResult.from_bytes(p.to_bytes()) for p in partials)
+    assert merged.result(return_average=False) == metric._compute(
+        predictions, references, "TimeQA", return_average=False
+    )
+    with pytest.raises(ValueError, match="with and without samples"):
+        merged.merge(metric.partial(predictions, references, "TimeQA"))
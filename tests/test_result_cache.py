@@ -0,0 +1,127 @@
+import sqlite3
+
+import pytest
+from conftest import MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, PREDICTION_3
+
+from timebench import timebench_cache
+from timebench.timebench_cache import ResultCache
+from timebench.timebench_eval import TimebenchEval
+
+
+@pytest.mark.parametrize("return_average", [True, False])
+def test_cached_scores_match_uncached(tmp_path, return_average):
+    path = tmp_path / "cache.sqlite"
+    expected = TimebenchEval()._compute(
+        MIXED_PREDICTIONS,
+        MIXED_REFERENCES,
+        MIXED_TASKS,
+        return_average,
+        diagnostics=True,
+    )
+    cold = TimebenchEval(result_cache=path)._compute(
+        MIXED_PREDICTIONS,
+        MIXED_REFERENCES,
+        MIXED_TASKS,
+        return_average,
+        diagnostics=True,
+    )
+    warm = TimebenchEval(result_cache=path)._compute(
+        MIXED_PREDICTIONS,
+        MIXED_REFERENCES,
+        MIXED_TASKS,
+        return_average,
+        diagnostics=True,
+    )
+    for metrics in (cold, warm):
+        assert {key: metrics[key] for key in expected if key != "diagnostics"} == {
+            key: expected[key] for key in expected if key != "diagnostics"
+        }
+    assert cold["diagnostics"]["counters"]["cache_misses"] == len(MIXED_PREDICTIONS)
+    assert warm["diagnostics"]["counters"]["cache_hits"] == len(MIXED_PREDICTIONS)
+    assert warm["diagnostics"]["counters"]["cache_misses"] == 0
+
+
+def test_only_changed_rows_are_scored(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    metric = TimebenchEval(result_cache=cache)
+    metric._compute(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)
+    changed = [PREDICTION_3] + MIXED_PREDICTIONS[1:]
+    metrics = metric._compute(
+        changed, MIXED_REFERENCES, MIXED_TASKS, return_average=False
+    )
+    assert (cache.hits, cache.misses) == (4, 6)
+    assert metrics == TimebenchEval()._compute(
+        changed, MIXED_REFERENCES, MIXED_TASKS, return_average=False
+    )
+
+
+def test_dates_completed_from_today_are_not_cached(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    metric = TimebenchEval(result_cache=cache)
+    predictions = [
+        "Thus, the correct answer is: Oct, 1987",
+        "Thus, the correct answer is: 1987",
+        "no answer",
+    ]
+    references = ["Oct, 1987", "Oct, 1987", "Oct, 1987"]
+    for _ in range(2):
+        metric._compute(predictions, references, "Date Arithmetic")
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert len(cache) == 2
+
+
+def test_answer_markers_are_part_of_the_key(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    TimebenchEval(result_cache=path)._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+    )
+    metric = TimebenchEval(result_cache=path, answer_markers=["Answer:"])
+    metric._compute(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)
+    assert metric.result_cache.hits == 0
+
+
+def test_scoring_version_change_invalidates(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    TimebenchEval(result_cache=path)._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+    )
+    assert len(ResultCache(path)) == len(set(zip(MIXED_PREDICTIONS, MIXED_REFERENCES)))
+    monkeypatch.setattr(timebench_cache, "SCORING_VERSION", "next")
+    assert len(ResultCache(path)) == 0
+
+
+def test_eviction(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "cache.sqlite", max_entries=3)
+    keys = ResultCache.keys("TimeQA", ["a", "b", "c", "d", "e"], ["x"] * 5, ["m"])
+    for offset, key in enumerate(keys):
+        monkeypatch.setattr(timebench_cache.time, "time", lambda offset=offset: offset)
+        cache.put_many([(key, {"exact_match": 1.0})])
+    assert len(cache) == 3
+    assert cache.get_many(keys).keys() == set(keys[2:])
+
+    cache.max_age = 1.5
+    cache.evict()
+    assert cache.get_many(keys).keys() == set(keys[3:])
+
+
+def test_lookups_do_not_need_the_write_lock(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    cache = ResultCache(path)
+    keys = ResultCache.keys("TimeQA", ["a", "b"], ["x", "x"], ["m"])
+    monkeypatch.setattr(timebench_cache.time, "time", lambda: 0.0)
+    cache.put_many([(keys[0], {"exact_match": 1.0})])
+
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    cache._connection.execute("PRAGMA busy_timeout = 0")
+    # Recently used entries are only read.
+    assert cache.get_many(keys).keys() == {keys[0]}
+    writer.execute("ROLLBACK")
+
+    # Entries unused for longer than the touch interval are marked as used again.
+    now = timebench_cache.CACHE_TOUCH_INTERVAL + 1
+    monkeypatch.setattr(timebench_cache.time, "time", lambda: now)
+    cache.get_many(keys)
+    (used,) = writer.execute("SELECT used FROM results").fetchone()
+    assert used == now
+    assert (cache.hits, cache.misses) == (2, 2)
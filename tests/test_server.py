@@ -0,0 +1,147 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS
+
+from timebench.timebench_eval import TimebenchEval
+from timebench.timebench_server import MicroBatcher, ScoringServer
+
+
+class FailingMetric(TimebenchEval):
+    """Metric whose scorer fails on every batch containing the reference "boom"."""
+
+    def score_rows(self, predictions, references, task, *args, **kwargs):
+        if "boom" in references:
+            raise RuntimeError("scorer failed")
+        return super().score_rows(predictions, references, task, *args, **kwargs)
+
+
+@pytest.fixture
+def server():
+    batcher = MicroBatcher(FailingMetric(), max_batch_size=64, max_delay=0.05)
+    server = ScoringServer(("127.0.0.1", 0), batcher, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    batcher.close()
+
+
+def request(server, path, payload=None):
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    data = None if payload is None else json.dumps(payload).encode()
+    with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+        return json.loads(response.read())
+
+
+def test_concurrent_requests_are_batched_and_match_compute(server):
+    metric = TimebenchEval()
+    payloads = [
+        {
+            "predictions": [MIXED_PREDICTIONS[i], MIXED_PREDICTIONS[(i + 1) % 5]],
+            "references": [MIXED_REFERENCES[i], MIXED_REFERENCES[(i + 1) % 5]],
+            "task": [MIXED_TASKS[i], MIXED_TASKS[(i + 1) % 5]],
+            "return_average": i % 2 == 0,
+        }
+        for i in range(5)
+    ] * 8
+    payloads += [
+        {"predictions": [p], "references": [r], "task": t, "return_average": False}
+        for p, r, t in zip(MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS)
+    ]
+    with ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+        outputs = list(pool.map(lambda p: request(server, "/score", p), payloads))
+    for payload, output in zip(payloads, outputs):
+        assert output == metric._compute(**payload)
+
+    stats = request(server, "/stats")
+    assert stats["requests"] == len(payloads)
+    assert stats["rows"] == sum(len(p["predictions"]) for p in payloads)
+    assert stats["batches"] < stats["requests"]
+    assert stats["max_batch_rows"] <= 64
+    assert stats["latency_seconds"]["p50"] <= stats["latency_seconds"]["max"]
+
+
+def test_invalid_request_returns_400(server):
+    payload = {"predictions": ["x"], "references": ["y"], "task": "Unknown"}
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(server, "/score", payload)
+    assert error.value.code == 400
+    assert "Unknown task" in json.loads(error.value.read())["error"]
+    assert request(server, "/health") == {"status": "ok"}
+
+
+def test_non_string_rows_return_400(server):
+    payload = {"predictions": ["x", 3], "references": ["y", "z"], "task": "TimeQA"}
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(server, "/score", payload)
+    assert error.value.code == 400
+    assert (
+        "predictions must be strings, got int at row 1"
+        in (json.loads(error.value.read())["error"])
+    )
+
+
+def test_scoring_failure_returns_500(server):
+    payload = {"predictions": ["x"], "references": ["boom"], "task": "TimeQA"}
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(server, "/score", payload)
+    assert error.value.code == 500
+    assert json.loads(error.value.read()) == {"error": "RuntimeError: scorer failed"}
+
+
+def test_failed_batch_only_fails_the_bad_request():
+    batcher = MicroBatcher(FailingMetric(), max_batch_size=64, max_delay=0.5)
+    good = batcher.submit(
+        ["Thus, the correct answer is: Troyes AC"], ["Troyes AC"], "TimeQA"
+    )
+    bad = batcher.submit(["Thus, the correct answer is: x"], ["boom"], "TimeQA")
+    also_good = batcher.submit(["Thus, the correct answer is: y"], ["z"], "TimeQA")
+    batcher.close()
+    assert good.result() == {"exact_match": [1.0], "f1": [1.0]}
+    assert also_good.result() == {"exact_match": [0.0], "f1": [0.0]}
+    with pytest.raises(RuntimeError, match="scorer failed"):
+        bad.result()
+
+
+def test_shared_metric_is_only_used_by_scoring_thread():
+    metric = TimebenchEval()
+    threads = set()
+    score_rows = metric.score_rows
+
+    def record_thread(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return score_rows(*args, **kwargs)
+
+    metric.score_rows = record_thread
+    batcher = MicroBatcher(metric, max_batch_size=3, max_delay=0.01)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        outputs = list(
+            pool.map(
+                lambda _: batcher.score(
+                    MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, False
+                ),
+                range(32),
+            )
+        )
+    batcher.close()
+    expected = TimebenchEval()._compute(
+        MIXED_PREDICTIONS, MIXED_REFERENCES, MIXED_TASKS, False
+    )
+    assert all(output == expected for output in outputs)
+    assert threads == {batcher._thread.ident}
+    assert batcher.stats()["max_batch_rows"] <= 3
+
+
+def test_batcher_rejects_closed_and_invalid_settings():
+    with pytest.raises(ValueError, match="max_batch_size"):
+        MicroBatcher(max_batch_size=0)
+    batcher = MicroBatcher()
+    batcher.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit(["x"], ["y"], "TimeQA")
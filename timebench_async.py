@@ -0,0 +1,165 @@
+"""Scoring of TimeBench rows from an async iterator while they arrive."""
+
+import asyncio
+from collections.abc import AsyncIterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from .timebench_core import TaskType
+from .timebench_scores import (
+    RunningScores,
+    TaskScores,
+    TimebenchResult,
+    average_by_task,
+)
+
+if TYPE_CHECKING:
+    from .timebench_eval import TimebenchEval
+
+DEFAULT_ASYNC_BATCH_SIZE = 256
+DEFAULT_ASYNC_MAX_DELAY = 0.1
+DEFAULT_ASYNC_MAX_PENDING = 4
+
+
+class AsyncEvaluator:
+    """
+    Score (prediction, reference, task) items of an async iterator while they arrive.
+
+    Items are collected into batches of ``batch_size`` rows, or fewer once no new item
+    arrived for ``max_delay`` seconds, and each batch is scored in an executor so the
+    event loop is never blocked by scoring. Up to ``max_pending`` batches are queued
+    for scoring while more items are being received. By default they are scored one
+    after another by a single thread owned by the evaluator, so the shared metric is
+    never entered concurrently. Scores are added to running statistics in
+    arrival order, so ``result()`` can be read at any time and the final result equals
+    ``compute`` with the same rows and a list of tasks.
+    """
+
+    def __init__(
+        self,
+        metric: "TimebenchEval | None" = None,
+        batch_size: int = DEFAULT_ASYNC_BATCH_SIZE,
+        max_delay: float | None = DEFAULT_ASYNC_MAX_DELAY,
+        max_pending: int = DEFAULT_ASYNC_MAX_PENDING,
+        executor: Executor | None = None,
+    ):
+        """
+        Args:
+            metric: Metric used for scoring; a default TimebenchEval if omitted.
+            batch_size: Number of items scored together.
+            max_delay: Seconds to wait for more items before scoring a partial
+                batch, None to only score full batches and the final rest.
+            max_pending: Maximum number of batches being scored at once.
+            executor: Executor the scoring runs in; a single thread created for each
+                ``consume`` call if omitted. Metrics with num_workers > 1 also use
+                their process pool.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be at least 1, got {max_pending}")
+        if metric is None:
+            from .timebench_eval import TimebenchEval
+
+            metric = TimebenchEval()
+        self.metric = metric
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.executor = executor
+        self.running: dict[str, RunningScores] = {}
+        self.rows = 0
+
+    def result(self) -> TimebenchResult:
+        """Return the overall and per-task averages of the rows scored so far."""
+        if not self.running:
+            raise ValueError("no rows have been scored yet")
+        return average_by_task(self.running)
+
+    async def consume(
+        self, items: AsyncIterable[tuple[str, str, TaskType]]
+    ) -> TimebenchResult:
+        """
+        Score every item of ``items`` and return the final averages.
+
+        Raises:
+            ValueError: If ``items`` yields no rows.
+        """
+        loop = asyncio.get_running_loop()
+        owned = None
+        if self.executor is None:
+            owned = ThreadPoolExecutor(max_workers=1, thread_name_prefix="timebench")
+        try:
+            return await self._consume(loop, items, self.executor or owned)
+        finally:
+            if owned is not None:
+                owned.shutdown(wait=False)
+
+    async def _consume(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        items: AsyncIterable[tuple[str, str, TaskType]],
+        executor: Executor,
+    ) -> TimebenchResult:
+        """Receive items, score their batches in ``executor`` and aggregate them."""
+        iterator = aiter(items)
+        pending: list[asyncio.Future] = []
+        batch: list[tuple[str, str, TaskType]] = []
+        deadline = 0.0
+        next_item = asyncio.ensure_future(anext(iterator))
+        try:
+            while True:
+                # Also wake up for the oldest scored batch, so result() stays current.
+                waiting = {next_item, *pending[:1]}
+                timeout = None
+                if batch and self.max_delay is not None:
+                    timeout = max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait(
+                    waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_item in done:
+                    try:
+                        item = next_item.result()
+                    except StopAsyncIteration:
+                        break
+                    if not batch and self.max_delay is not None:
+                        deadline = loop.time() + self.max_delay
+                    batch.append(item)
+                    next_item = asyncio.ensure_future(anext(iterator))
+                if len(batch) >= self.batch_size or (
+                    batch and self.max_delay is not None and loop.time() >= deadline
+                ):
+                    pending.append(self._submit(loop, executor, batch))
+                    batch = []
+                while pending and (
+                    len(pending) > self.max_pending or pending[0].done()
+                ):
+                    self._update(await pending.pop(0))
+        finally:
+            if not next_item.done():
+                next_item.cancel()
+        if batch:
+            pending.append(self._submit(loop, executor, batch))
+        for future in pending:
+            self._update(await future)
+        return self.result()
+
+    def _submit(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        executor: Executor,
+        batch: list[tuple[str, str, TaskType]],
+    ) -> asyncio.Future:
+        """Start scoring a batch in the executor."""
+        predictions, references, tasks = (list(column) for column in zip(*batch))
+        return loop.run_in_executor(
+            executor, self.metric.score_rows, predictions, references, tasks
+        )
+
+    def _update(self, grouped: TaskScores) -> None:
+        """Add the scores of a finished batch to the running statistics."""
+        for task, (indices, results) in grouped.items():
+            if task not in self.running:
+                self.running[task] = RunningScores()
+            self.running[task].update(results)
+            self.rows += len(indices)
@@ -0,0 +1,165 @@
+"""Bootstrap confidence intervals and paired significance tests of TimeBench scores."""
+
+from collections.abc import Iterable
+from typing import TypedDict
+
+import numpy as np
+
+DEFAULT_BOOTSTRAP_RESAMPLES = 10_000
+DEFAULT_CONFIDENCE_LEVEL = 0.95
+# Resampled values are drawn in chunks of at most this many elements at a time.
+BOOTSTRAP_CHUNK_ELEMENTS = 1 << 22
+# Cost of the multinomial draw of one distinct value in index draws of one row. At
+# 100,000 rows a draw takes 0.11 (skewed counts) to 0.25 (even counts) microseconds
+# per distinct value and an index draw 0.009 microseconds per row.
+BOOTSTRAP_MULTINOMIAL_COST = 20
+
+
+class PairedTestResult(TypedDict):
+    difference: float
+    confidence_interval: tuple[float, float]
+    p_value: float
+
+
+def bootstrap_means(
+    values: Iterable[float],
+    resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES,
+    seed: int | np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Return the means of ``resamples`` bootstrap resamples of ``values``.
+
+    A resample's mean only depends on how often each distinct value is drawn. Scores
+    take few distinct values (exact match only 0 and 1), so the draw counts are
+    sampled from a multinomial distribution, which is equivalent to drawing index
+    matrices but costs resamples x distinct values instead of resamples x rows.
+    Values with many distinct entries fall back to chunked index matrices, which
+    cost resamples x rows draws: paired differences of free-text F1 scores take
+    several seconds for 10,000 resamples of 100,000 rows.
+    """
+    if resamples < 1:
+        raise ValueError(f"resamples must be at least 1, got {resamples}")
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        raise ValueError("cannot bootstrap an empty list of scores")
+    rng = np.random.default_rng(seed)
+    rows = len(values)
+    distinct, counts = np.unique(values, return_counts=True)
+    # The multinomial sampler stops once all rows are drawn, so frequent values go
+    # first and the tail of rare values is mostly skipped.
+    order = np.argsort(counts, kind="stable")[::-1]
+    distinct, counts = distinct[order], counts[order]
+    means = np.empty(resamples)
+    if len(distinct) * BOOTSTRAP_MULTINOMIAL_COST <= rows:
+        step = max(1, BOOTSTRAP_CHUNK_ELEMENTS // len(distinct))
+        probabilities = counts / rows
+        for start in range(0, resamples, step):
+            stop = min(start + step, resamples)
+            draws = rng.multinomial(rows, probabilities, size=stop - start)
+            means[start:stop] = draws @ distinct / rows
+    else:
+        step = max(1, BOOTSTRAP_CHUNK_ELEMENTS // rows)
+        for start in range(0, resamples, step):
+            stop = min(start + step, resamples)
+            indices = rng.integers(0, rows, size=(stop - start, rows))
+            means[start:stop] = values[indices].mean(axis=1)
+    return means
+
+
+def _percentile_interval(
+    means: np.ndarray, confidence_level: float
+) -> tuple[float, float]:
+    """Return the percentile interval of bootstrap means."""
+    if not 0 < confidence_level < 1:
+        raise ValueError(
+            f"confidence_level must be between 0 and 1, got {confidence_level}"
+        )
+    tail = (1 - confidence_level) / 2
+    low, high = np.quantile(means, [tail, 1 - tail])
+    return float(low), float(high)
+
+
+def bootstrap_confidence_interval(
+    values: Iterable[float],
+    resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES,
+    confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+    seed: int | np.random.Generator | None = None,
+) -> tuple[float, float]:
+    """Percentile bootstrap confidence interval of the mean of per-sample scores."""
+    return _percentile_interval(
+        bootstrap_means(values, resamples, seed), confidence_level
+    )
+
+
+def paired_bootstrap_test(
+    scores_a: Iterable[float],
+    scores_b: Iterable[float],
+    resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES,
+    confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+    seed: int | np.random.Generator | None = None,
+) -> PairedTestResult:
+    """
+    Paired bootstrap test of two systems scored on the same references.
+
+    Rows are resampled jointly, so the test runs on the per-row differences. The
+    two-sided p-value is the share of resampled mean differences, shifted to a mean
+    of zero, that are at least as far from zero as the observed difference.
+
+    Raises:
+        ValueError: If the two systems have a different number of scores.
+    """
+    scores_a = np.asarray(scores_a, dtype=np.float64)
+    scores_b = np.asarray(scores_b, dtype=np.float64)
+    if scores_a.shape != scores_b.shape:
+        raise ValueError(
+            f"scores_a and scores_b must have the same length, "
+            f"got {len(scores_a)} and {len(scores_b)}"
+        )
+    differences = scores_a - scores_b
+    means = bootstrap_means(differences, resamples, seed)
+    observed = float(differences.mean())
+    extreme = int(np.count_nonzero(np.abs(means - observed) >= abs(observed)))
+    return {
+        "difference": observed,
+        "confidence_interval": _percentile_interval(means, confidence_level),
+        "p_value": (extreme + 1) / (resamples + 1),
+    }
+
+
+def confidence_intervals_by_task(
+    samples_by_task: dict[str, dict[str, list[float]]],
+    resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES,
+    confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+    seed: int | np.random.Generator | None = None,
+    per_task: bool = True,
+) -> dict:
+    """
+    Bootstrap confidence intervals of every score, overall and optionally per task.
+
+    Args:
+        samples_by_task: Per-sample scores of each task.
+        per_task: If True, the intervals of each task are added under "per_task".
+
+    Returns:
+        Mapping of score name to its (low, high) interval, like the averages of compute.
+    """
+    rng = np.random.default_rng(seed)
+    overall: dict[str, list[float]] = {}
+    for samples in samples_by_task.values():
+        for key, values in samples.items():
+            overall.setdefault(key, []).extend(values)
+    intervals: dict = {
+        key: bootstrap_confidence_interval(values, resamples, confidence_level, rng)
+        for key, values in overall.items()
+    }
+    if per_task:
+        intervals["per_task"] = {
+            task: {
+                key: bootstrap_confidence_interval(
+                    values, resamples, confidence_level, rng
+                )
+                for key, values in samples.items()
+            }
+            for task, samples in samples_by_task.items()
+        }
+    return intervals
@@ -0,0 +1,185 @@
+"""Persistent SQLite cache of TimeBench per-sample scores."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+
+from .timebench_core import DEFAULT_OPTION_LETTERS, SCORING_VERSION
+
+DEFAULT_CACHE_MAX_ENTRIES = 10_000_000
+# SQLite limits the number of bound parameters of a single statement.
+CACHE_QUERY_CHUNK = 900
+# Last use of cached rows is only rewritten once it is older than this many seconds.
+CACHE_TOUCH_INTERVAL = 3600.0
+
+
+class ResultCache:
+    """
+    Persistent per-sample scores keyed by a hash of task, prediction and reference.
+
+    Re-scoring a prediction file in which only a few rows changed then only scores
+    the new or changed rows. Keys also cover the answer markers, the option
+    alphabet and the scoring version; entries of another ``SCORING_VERSION`` are
+    dropped when the cache is opened. Entries are evicted by age and, beyond
+    ``max_entries``, least recently used first. The cache is an SQLite file and can
+    be shared by several threads.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        max_entries: int | None = DEFAULT_CACHE_MAX_ENTRIES,
+        max_age: float | None = None,
+    ):
+        """
+        Args:
+            path: SQLite file holding the cache; created if it does not exist.
+            max_entries: Maximum number of cached rows, None for no limit.
+            max_age: Seconds after their last use at which rows are evicted, None
+                to keep them regardless of age.
+        """
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key BLOB PRIMARY KEY, scores TEXT NOT NULL, used REAL NOT NULL) "
+                "WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_used ON results (used)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE name = 'scoring_version'"
+            ).fetchone()
+            if row is None or row[0] != SCORING_VERSION:
+                self._connection.execute("DELETE FROM results")
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('scoring_version', ?)",
+                    (SCORING_VERSION,),
+                )
+
+    @staticmethod
+    def keys(
+        task: str,
+        predictions: Iterable[str],
+        references: Iterable[str],
+        markers: Iterable[str],
+        option_letters: str = DEFAULT_OPTION_LETTERS,
+    ) -> list[bytes]:
+        """Return the cache key of every row of one task."""
+        base = hashlib.sha256()
+        for part in (SCORING_VERSION, option_letters, *markers, task):
+            _hash_field(base, part)
+        keys = []
+        for prediction, reference in zip(predictions, references):
+            digest = base.copy()
+            _hash_field(digest, prediction)
+            _hash_field(digest, reference)
+            keys.append(digest.digest()[:16])
+        return keys
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, dict[str, float]]:
+        """
+        Return the cached scores of the keys found and mark them as used.
+
+        Lookups only read unless a found entry was last marked more than
+        ``CACHE_TOUCH_INTERVAL`` seconds ago, so they do not wait for the write
+        lock of another process in the common case.
+        """
+        found = {}
+        stale = []
+        # Rows share few distinct score combinations, so each is decoded only once.
+        decoded: dict[str, dict[str, float]] = {}
+        now = time.time()
+        with self._lock, self._connection:
+            for start in range(0, len(keys), CACHE_QUERY_CHUNK):
+                chunk = keys[start : start + CACHE_QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, scores, used FROM results "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, scores, used in rows:
+                    if scores not in decoded:
+                        decoded[scores] = json.loads(scores)
+                    found[key] = decoded[scores]
+                    if used < now - CACHE_TOUCH_INTERVAL:
+                        stale.append(key)
+            for start in range(0, len(stale), CACHE_QUERY_CHUNK):
+                chunk = stale[start : start + CACHE_QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                self._connection.execute(
+                    f"UPDATE results SET used = ? WHERE key IN ({placeholders})",
+                    [now, *chunk],
+                )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[tuple[bytes, dict[str, float]]]) -> None:
+        """Store the scores of freshly scored rows and evict old entries."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                [(key, json.dumps(scores), now) for key, scores in items],
+            )
+            self._evict()
+
+    def evict(self) -> None:
+        """Drop entries older than max_age and the least recently used beyond max_entries."""
+        with self._lock, self._connection:
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.max_age is not None:
+            self._connection.execute(
+                "DELETE FROM results WHERE used < ?", (time.time() - self.max_age,)
+            )
+        if self.max_entries is not None:
+            (entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM results"
+            ).fetchone()
+            if entries > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY used LIMIT ?)",
+                    (entries - self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (entries,) = self._connection.execute(
+                "SELECT COUNT(*) FROM results"
+            ).fetchone()
+        return entries
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._connection.close()
+
+
+def _hash_field(digest: "hashlib._Hash", text: str) -> None:
+    """Add a length-prefixed string to a hash, so that field boundaries are unambiguous."""
+    encoded = text.encode("utf-8", "surrogatepass")
+    digest.update(len(encoded).to_bytes(8, "little"))
+    digest.update(encoded)
@@ -0,0 +1,142 @@
+"""Command-line batch scorer for large TimeBench prediction files.
+
+Streams JSONL, Parquet or Arrow files through ``TimebenchEval`` batch by batch, so
+memory stays bounded by the batch size. Writes overall and per-task averages as
+JSON and, optionally, the per-sample scores as JSON Lines.
+
+Example:
+    timebench-eval generations.parquet --task-column task --output scores.json \\
+        --samples samples.jsonl --num-workers 8
+"""
+
+import argparse
+import json
+import sys
+import time
+from contextlib import ExitStack
+
+from .timebench_eval import (
+    DEFAULT_BATCH_SIZE,
+    NULL_DIAGNOSTICS,
+    VALID_TASKS,
+    Diagnostics,
+    TimebenchEval,
+    iter_source_batches,
+)
+from .timebench_scores import RunningScores, average_by_task, merge_task_scores
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="timebench-eval",
+        description="Score TimeBench predictions from JSONL, Parquet or Arrow files.",
+    )
+    parser.add_argument("inputs", nargs="+", help="JSONL, Parquet or Arrow files")
+    task = parser.add_mutually_exclusive_group(required=True)
+    task.add_argument("--task", choices=sorted(VALID_TASKS), help="task of every row")
+    task.add_argument("--task-column", help="column holding the task of each row")
+    parser.add_argument("--prediction-column", default="prediction")
+    parser.add_argument("--reference-column", default="reference")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--num-workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument(
+        "--cache", help="result cache file; only new or changed rows are scored"
+    )
+    parser.add_argument("--output", help="write the aggregates as JSON to this file")
+    parser.add_argument(
+        "--samples", help="write per-sample scores as JSONL to this file"
+    )
+    parser.add_argument(
+        "--diagnostics", action="store_true", help="report stage timings and counters"
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="do not report progress on stderr"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metric = TimebenchEval(
+        num_workers=args.num_workers,
+        chunk_size=args.chunk_size,
+        result_cache=args.cache,
+    )
+    diagnostics = Diagnostics() if args.diagnostics else NULL_DIAGNOSTICS
+    running: dict[str, RunningScores] = {}
+    rows = 0
+    start = time.perf_counter()
+
+    with ExitStack() as stack:
+        samples_file = None
+        if args.samples:
+            samples_file = stack.enter_context(
+                open(args.samples, "w", encoding="utf-8")
+            )
+        for path in args.inputs:
+            batches = iter_source_batches(
+                path,
+                task=args.task,
+                prediction_column=args.prediction_column,
+                reference_column=args.reference_column,
+                task_column=args.task_column,
+                batch_size=args.batch_size,
+            )
+            file_row = 0
+            for predictions, references, task in batches:
+                grouped = metric.score_rows(predictions, references, task, diagnostics)
+                for group_task, (_, group_scores) in grouped.items():
+                    if group_task not in running:
+                        running[group_task] = RunningScores()
+                    running[group_task].update(group_scores)
+                if samples_file is not None:
+                    scores = merge_task_scores(grouped, len(predictions), False)
+                    del scores["per_task"]
+                    tasks = (
+                        task if not isinstance(task, str) else [task] * len(predictions)
+                    )
+                    for index, row_task in enumerate(tasks):
+                        sample = {
+                            "file": path,
+                            "row": file_row + index,
+                            "task": row_task,
+                        }
+                        for key, values in scores.items():
+                            if values[index] is not None:
+                                sample[key] = values[index]
+                        samples_file.write(json.dumps(sample) + "\n")
+                file_row += len(predictions)
+                rows += len(predictions)
+                if not args.quiet:
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"{path}: {file_row} rows, {rows} total, "
+                        f"{rows / elapsed:.0f} rows/s",
+                        file=sys.stderr,
+                    )
+
+    if not rows:
+        print("no rows found in the inputs", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - start
+    report = {
+        **average_by_task(running),
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed,
+    }
+    if args.diagnostics:
+        report["diagnostics"] = diagnostics.as_dict()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
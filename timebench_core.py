@@ -0,0 +1,424 @@
+# Copyright 2020 The HuggingFace Datasets Authors and the current dataset script contributor.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pure-Python scoring core of the TimeBench evaluation metric.
+
+Answer extraction, SQuAD exact match and F1, Date Arithmetic comparison and TimeDial
+option scoring as plain functions that only depend on the standard library and
+dateutil, for slim containers and serverless functions. ``TimebenchEval``, the
+``evaluate.Metric`` adapter, is imported from ``timebench_eval`` on first access.
+"""
+
+import re
+import string
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Literal
+
+from dateutil import parser
+from dateutil.parser import ParserError
+
+TASK_TEMPREASON = "TempReason"
+TASK_TIMEQA = "TimeQA"
+TASK_MENATQA = "MenatQA"
+TASK_DATE_ARITHMETIC = "Date Arithmetic"
+TASK_TIMEDIAL = "TimeDial"
+VALID_TASKS = frozenset(
+    {TASK_TEMPREASON, TASK_TIMEQA, TASK_MENATQA, TASK_DATE_ARITHMETIC, TASK_TIMEDIAL}
+)
+
+SQUAD_TASKS = frozenset({TASK_TEMPREASON, TASK_TIMEQA, TASK_MENATQA})
+
+TaskType = Literal["TempReason", "TimeQA", "MenatQA", "Date Arithmetic", "TimeDial"]
+
+# Bump whenever a change alters any per-sample score; result caches written by an
+# older version are then discarded.
+SCORING_VERSION = "1"
+
+ANSWER_MARKER = "Thus, the correct answer is:"
+NON_WHITESPACE_REGEX = re.compile(r"\S")
+
+DEFAULT_OPTION_LETTERS = "ABCD"
+SELECTED_OPTIONS_TEMPLATE = r"\b([{letters}])(?:\.|,|\s|&|$)"
+SELECTED_OPTIONS_PATTERN = SELECTED_OPTIONS_TEMPLATE.format(letters="A-D")
+SELECTED_OPTIONS_REGEX = re.compile(SELECTED_OPTIONS_PATTERN)
+# Option bitmasks are Python ints, but array-backed masks hold at most 64 bits.
+MAX_OPTION_LETTERS = 64
+
+# Month/year answers such as "Aug, 1987", "August 1804" or "Jan 2020" make up almost all
+# Date Arithmetic answers; they are recognized without going through dateutil.
+MONTH_NUMBERS = {
+    name: number
+    for number, names in enumerate(
+        [
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "sept", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+MONTH_YEAR_PATTERN = r"[ \t]*([A-Za-z]+)\.?[ \t]*,?[ \t]*([1-9][0-9]{3})[ \t]*"
+MONTH_YEAR_REGEX = re.compile(MONTH_YEAR_PATTERN)
+
+SQUAD_ARTICLES_REGEX = re.compile(r"\b(a|an|the)\b")
+SQUAD_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+
+class AnswerExtractor:
+    """
+    Extract the answer line after the last answer marker of a response.
+
+    The response is searched backwards for the last marker and only the first
+    non-empty line after it is copied, so long chain-of-thought outputs with
+    repeated markers are never split into intermediate lists.
+    """
+
+    def __init__(self, markers: Iterable[str] = (ANSWER_MARKER,)):
+        """
+        Args:
+            markers: Answer markers to look for. With several markers, the one
+                occurring last in the response wins.
+        """
+        self.markers = tuple(markers)
+        if not self.markers or not all(self.markers):
+            raise ValueError("markers must be a non-empty list of non-empty strings")
+        # A greedy ".*" first runs to the end of the response and then backtracks, so
+        # the alternation is tried from the end and the first hit is the last marker.
+        alternatives = sorted(self.markers, key=len, reverse=True)
+        self._last_marker_regex = re.compile(
+            "(?s:.*)(?:" + "|".join(map(re.escape, alternatives)) + ")"
+        )
+
+    def __call__(self, response: str) -> str | None:
+        """Extract the answer from a single response."""
+        if len(self.markers) == 1:
+            start = response.rfind(self.markers[0])
+            if start == -1:
+                return None
+            start += len(self.markers[0])
+        else:
+            match = self._last_marker_regex.match(response)
+            if match is None:
+                return None
+            start = match.end()
+
+        first = NON_WHITESPACE_REGEX.search(response, start)
+        if first is None:
+            return None
+        # Take only the first line (stops at newlines if model continues)
+        end = response.find("\n", first.start())
+        if end == -1 or NON_WHITESPACE_REGEX.search(response, end) is None:
+            answer = response[first.start() :].rstrip()
+        else:
+            answer = response[first.start() : end]
+        answer = answer.rstrip(".!?").strip()
+        if "unanswerable" in answer.lower():
+            return "unanswerable"
+        return answer or None
+
+    def extract_many(self, responses: Iterable[str]) -> list[str | None]:
+        """Extract the answers of a batch of responses."""
+        return [self(response) for response in responses]
+
+
+DEFAULT_ANSWER_EXTRACTOR = AnswerExtractor()
+
+
+class OptionExtractor:
+    """
+    Extract the multiple-choice options selected in a TimeDial answer as bitmasks.
+
+    Bit i of a mask is set if the i-th letter of the option alphabet is selected, so
+    set operations on options become integer AND and popcount.
+    """
+
+    def __init__(self, letters: str = DEFAULT_OPTION_LETTERS):
+        """
+        Args:
+            letters: Option alphabet, one character per choice (at most 64).
+        """
+        if not letters or len(set(letters)) != len(letters):
+            raise ValueError(f"letters must be distinct characters, got {letters!r}")
+        if len(letters) > MAX_OPTION_LETTERS:
+            raise ValueError(
+                f"at most {MAX_OPTION_LETTERS} option letters are supported, "
+                f"got {letters!r}"
+            )
+        self.letters = letters
+        self.regex = re.compile(
+            SELECTED_OPTIONS_TEMPLATE.format(letters="".join(map(re.escape, letters)))
+        )
+        self._bits = {letter: 1 << bit for bit, letter in enumerate(letters)}
+
+    def options(self, text: str | None) -> set[str]:
+        """Return the set of selected option letters."""
+        if not text:
+            return set()
+        return set(self.regex.findall(text))
+
+    def mask(self, text: str | None) -> int:
+        """Return the bitmask of the selected options."""
+        mask = 0
+        if text:
+            for letter in self.regex.findall(text):
+                mask |= self._bits[letter]
+        return mask
+
+    def masks(self, texts: Iterable[str | None]) -> list[int]:
+        """Return the bitmasks of a batch of answers."""
+        return [self.mask(text) for text in texts]
+
+
+def normalize_squad_answer(text: str) -> str:
+    """Lower text and remove punctuation, articles and extra whitespace (SQuAD v1.1)."""
+    text = text.lower().translate(SQUAD_PUNCTUATION_TABLE)
+    text = SQUAD_ARTICLES_REGEX.sub(" ", text)
+    return " ".join(text.split())
+
+
+def squad_scores(
+    predictions: list[str], references: list[str]
+) -> tuple[list[float], list[float]]:
+    """
+    Compute per-sample SQuAD exact match and token-level F1 in a single pass.
+
+    Scores are identical to calling the ``squad`` metric once per pair and dividing
+    its percentages by 100, without going through the ``evaluate.Metric`` machinery.
+
+    Args:
+        predictions: List of extracted answer strings.
+        references: List of reference answer strings.
+
+    Returns:
+        Tuple of (exact_match, f1) lists with scores between 0.0 and 1.0.
+    """
+    return squad_scores_normalized(
+        [normalize_squad_answer(pred) for pred in predictions],
+        [normalize_squad_answer(ref) for ref in references],
+    )
+
+
+def intern_values(values: list) -> tuple[list, list[int]]:
+    """
+    Deduplicate hashable values in first-seen order.
+
+    Returns:
+        The distinct values and, for every input value, the position of its
+        distinct value, so per-value results can be scattered back with it.
+    """
+    positions: dict = {}
+    inverse = [positions.setdefault(value, len(positions)) for value in values]
+    return list(positions), inverse
+
+
+def squad_tokens(normalized: str) -> Counter:
+    """Return the bag of tokens of a normalized answer that F1 is computed on."""
+    return Counter(normalized.split())
+
+
+def squad_scores_normalized(
+    predictions: list[str],
+    references: list[str],
+    reference_tokens: Mapping[str, Counter] | None = None,
+) -> tuple[list[float], list[float]]:
+    """
+    Same as ``squad_scores`` for answers already passed through ``normalize_squad_answer``.
+
+    Every distinct (prediction, reference) pair is scored once. ``reference_tokens``
+    optionally maps normalized references to their ``squad_tokens``, e.g. from a
+    reference index, so they are not rebuilt.
+    """
+    pairs, inverse = intern_values(list(zip(predictions, references)))
+    unique_matches = []
+    unique_f1 = []
+    for pred_norm, ref_norm in pairs:
+        unique_matches.append(1.0 if pred_norm == ref_norm else 0.0)
+
+        pred_tokens = pred_norm.split()
+        if reference_tokens is not None:
+            ref_bag = reference_tokens[ref_norm]
+        else:
+            ref_bag = squad_tokens(ref_norm)
+        num_same = sum((Counter(pred_tokens) & ref_bag).values())
+        if num_same == 0:
+            unique_f1.append(0.0)
+            continue
+        precision = 1.0 * num_same / len(pred_tokens)
+        recall = 1.0 * num_same / ref_bag.total()
+        f1 = (2 * precision * recall) / (precision + recall)
+        # Round-trip through a percentage like the squad metric does, so the
+        # scores stay bit-identical to the previous per-sample implementation.
+        unique_f1.append(100.0 * f1 / 100)
+    return (
+        [unique_matches[position] for position in inverse],
+        [unique_f1[position] for position in inverse],
+    )
+
+
+def parse_historical_date(date_str: str | None) -> datetime | None:
+    """
+    Parse a date string and return a datetime object with day set to 1.
+
+    Month/year strings are recognized by a compiled fast path; anything else
+    falls back to dateutil.
+
+    Args:
+        date_str: String representation of a date, or None.
+
+    Returns:
+        datetime object with day set to 1, or None if parsing fails or input is None.
+    """
+    if date_str is None:
+        return None
+    match = MONTH_YEAR_REGEX.fullmatch(date_str)
+    if match:
+        month = MONTH_NUMBERS.get(match.group(1).lower())
+        if month is not None:
+            return datetime(int(match.group(2)), month, 1)
+    try:
+        return parser.parse(date_str).replace(day=1)
+    except ParserError:
+        return None
+
+
+def extract_answer(response: str) -> str | None:
+    """Extract the answer after the last default answer marker of a response."""
+    return DEFAULT_ANSWER_EXTRACTOR(response)
+
+
+def date_scores(
+    predictions: Iterable[str | None], references: Iterable[str | None]
+) -> list[int]:
+    """
+    Compare extracted date answers with reference dates at month precision.
+
+    Returns:
+        List of 0/1 exact match scores. Two unparseable dates count as a match.
+    """
+    return date_matches(
+        map(parse_historical_date, predictions), map(parse_historical_date, references)
+    )
+
+
+def date_matches(
+    predictions: Iterable[datetime | None], references: Iterable[datetime | None]
+) -> list[int]:
+    """Same as ``date_scores`` for dates already parsed by ``parse_historical_date``."""
+    return [1 if pred == ref else 0 for pred, ref in zip(predictions, references)]
+
+
+def option_mask_scores(
+    pred_masks: Iterable[int], ref_masks: Iterable[int]
+) -> tuple[list[int], list[float]]:
+    """
+    Compute set-based exact match and F1 of TimeDial option bitmasks.
+
+    Two empty sets score an F1 of 1.0, a single empty set 0.0. Every distinct
+    (prediction, reference) pair is scored once.
+
+    Returns:
+        Tuple of (exact_match, f1) lists.
+    """
+    pairs, inverse = intern_values(list(zip(pred_masks, ref_masks)))
+    unique_matches = []
+    unique_f1 = []
+    for pred_mask, ref_mask in pairs:
+        unique_matches.append(1 if pred_mask == ref_mask else 0)
+        true_positives = (pred_mask & ref_mask).bit_count()
+        if not pred_mask and not ref_mask:
+            unique_f1.append(1.0)
+        elif not true_positives:
+            unique_f1.append(0.0)
+        else:
+            precision = true_positives / pred_mask.bit_count()
+            recall = true_positives / ref_mask.bit_count()
+            unique_f1.append(2 * precision * recall / (precision + recall))
+    return (
+        [unique_matches[position] for position in inverse],
+        [unique_f1[position] for position in inverse],
+    )
+
+
+def score_task(
+    predictions: list[str],
+    references: list[str],
+    task: TaskType,
+    answer_extractor: AnswerExtractor = DEFAULT_ANSWER_EXTRACTOR,
+    option_extractor: "OptionExtractor | None" = None,
+) -> dict[str, list[float]]:
+    """
+    Compute the per-sample scores of raw predictions of a single task.
+
+    Scores equal those of ``TimebenchEval`` with ``return_average=False``.
+
+    Args:
+        predictions: Model responses containing an answer marker.
+        references: Reference answers.
+        task: Task type, one of ``VALID_TASKS``.
+        answer_extractor: Extractor of the answers of the responses.
+        option_extractor: Extractor of TimeDial options, by default options A-D.
+
+    Returns:
+        Dictionary with "exact_match" and, except for Date Arithmetic, "f1" lists.
+
+    Raises:
+        ValueError: If predictions is empty.
+        ValueError: If predictions and references have different lengths.
+        ValueError: If task is not a valid task type.
+    """
+    if not predictions:
+        raise ValueError("predictions cannot be empty")
+    if len(predictions) != len(references):
+        raise ValueError(
+            f"predictions and references must have same length, "
+            f"got {len(predictions)} and {len(references)}"
+        )
+    if task not in VALID_TASKS:
+        raise ValueError(
+            f"Unknown task: {task}. Expected one of: {', '.join(VALID_TASKS)}"
+        )
+    answers = answer_extractor.extract_many(predictions)
+    if task in SQUAD_TASKS:
+        exact_matches, f1_scores = squad_scores(
+            [answer or "" for answer in answers], references
+        )
+        return {"exact_match": exact_matches, "f1": f1_scores}
+    if task == TASK_DATE_ARITHMETIC:
+        return {"exact_match": date_scores(answers, references)}
+    option_extractor = option_extractor or OptionExtractor()
+    exact_matches, f1_scores = option_mask_scores(
+        option_extractor.masks(answers), option_extractor.masks(references)
+    )
+    return {"exact_match": exact_matches, "f1": f1_scores}
+
+
+def __getattr__(name: str):
+    """Import the ``evaluate.Metric`` adapter lazily, with its heavy dependencies."""
+    if name == "TimebenchEval":
+        from .timebench_eval import TimebenchEval
+
+        return TimebenchEval
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,35 +13,412 @@
 # limitations under the License.
 """Evaluation metric for the TimeBench temporal reasoning benchmark."""
 
-import re
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
-from typing import Literal, TypedDict
+from typing import Literal
 
 import datasets
 import evaluate
-from dateutil import parser
-from dateutil.parser import ParserError
-
-TASK_TEMPREASON = "TempReason"
-TASK_TIMEQA = "TimeQA"
-TASK_MENATQA = "MenatQA"
-TASK_DATE_ARITHMETIC = "Date Arithmetic"
-TASK_TIMEDIAL = "TimeDial"
-VALID_TASKS = frozenset(
-    {TASK_TEMPREASON, TASK_TIMEQA, TASK_MENATQA, TASK_DATE_ARITHMETIC, TASK_TIMEDIAL}
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .timebench_bootstrap import (
+    DEFAULT_BOOTSTRAP_RESAMPLES,
+    DEFAULT_CONFIDENCE_LEVEL,
+    confidence_intervals_by_task,
+    paired_bootstrap_test,
+)
+from .timebench_cache import ResultCache
+from .timebench_core import (
+    ANSWER_MARKER,
+    DEFAULT_ANSWER_EXTRACTOR,
+    DEFAULT_OPTION_LETTERS,
+    MAX_OPTION_LETTERS,
+    MONTH_NUMBERS,
+    MONTH_YEAR_REGEX,
+    SQUAD_TASKS,
+    TASK_DATE_ARITHMETIC,
+    VALID_TASKS,
+    AnswerExtractor,
+    OptionExtractor,
+    TaskType,
+    date_matches,
+    intern_values,
+    normalize_squad_answer,
+    parse_historical_date,
+    squad_scores_normalized,
+)
+from .timebench_index import ReferenceIndex
+from .timebench_partial import PartialResult
+from .timebench_scores import (
+    GroupBy,
+    RunningScores,
+    TaskScores,
+    TimebenchResult,
+    average_by_group,
+    average_by_task,
+    check_group_by,
+    finalize_running,
+    merge_task_scores,
 )
 
-SQUAD_TASKS = frozenset({TASK_TEMPREASON, TASK_TIMEQA, TASK_MENATQA})
+# Smallest unsigned dtype holding one bit per option, by maximum number of options.
+OPTION_MASK_DTYPES = (
+    (8, np.uint8),
+    (16, np.uint16),
+    (32, np.uint32),
+    (MAX_OPTION_LETTERS, np.uint64),
+)
+POPCOUNT_TABLE = np.array([byte.bit_count() for byte in range(256)], np.uint8)
+
+DEFAULT_DATE_CACHE_SIZE = 4096
+
+
+DIAGNOSTIC_STAGES = ("extraction", "parsing", "scoring", "aggregation")
+DIAGNOSTIC_COUNTERS = (
+    "extraction_misses",
+    "parse_failures",
+    "empty_option_sets",
+    "unanswerable",
+    "answers",
+    "unique_answers",
+    "references",
+    "unique_references",
+)
+
+
+SampleFormat = Literal["list", "numpy", "arrow"]
+SAMPLE_FORMATS = ("list", "numpy", "arrow")
+# Dtypes of array-backed per-sample scores; f1 is NaN where it does not apply to a row.
+SAMPLE_DTYPES = {"exact_match": np.uint8, "f1": np.float32}
+
+
+class Diagnostics:
+    """
+    Wall time per scoring stage and hot-path counters of one or more scored batches.
+
+    Stages are answer extraction, parsing (SQuAD normalization, date parsing or
+    option extraction), scoring and aggregation. Counters are extraction misses,
+    date parse failures, empty TimeDial option sets and "unanswerable" answers, the
+    number of extracted answers and raw references parsed and how many of them were
+    distinct, plus cache hits and misses when a result cache is used.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = dict.fromkeys(DIAGNOSTIC_STAGES, 0.0)
+        self.counters = dict.fromkeys(DIAGNOSTIC_COUNTERS, 0)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the wall time spent in the with-block to the given stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def count(self, name: str, value: int) -> None:
+        """Increase the given counter; optional counters start at zero when first used."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: "Diagnostics") -> None:
+        """Add the timings and counters of another collector."""
+        for name, seconds in other.timings.items():
+            self.timings[name] += seconds
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def as_dict(self) -> dict:
+        """
+        Return the timings (in seconds) and counters as plain dictionaries.
+
+        Once values were parsed, ``dedup_ratio`` is the number of answers and
+        references per distinct one actually normalized, parsed or option-extracted.
+        """
+        output = {"timings": dict(self.timings), "counters": dict(self.counters)}
+        unique = self.counters.get("unique_answers", 0) + self.counters.get(
+            "unique_references", 0
+        )
+        if unique:
+            total = self.counters["answers"] + self.counters.get("references", 0)
+            output["dedup_ratio"] = total / unique
+        return output
+
+
+class _NullDiagnostics(Diagnostics):
+    """Diagnostics stand-in that records nothing, used when diagnostics are off."""
+
+    enabled = False
+
+    def __init__(self):
+        self._stage = nullcontext()
+
+    def stage(self, name: str):
+        return self._stage
+
+    def count(self, name: str, value: int) -> None:
+        pass
+
+
+NULL_DIAGNOSTICS = _NullDiagnostics()
+
+DEFAULT_BATCH_SIZE = 10_000
+TABLE_SOURCE_TYPES = (pa.Table, pa.RecordBatch, datasets.Dataset, str, os.PathLike)
+COLUMN_SOURCE_TYPES = (pa.Array, pa.ChunkedArray, np.ndarray)
+SOURCE_OPTIONS = ("prediction_column", "reference_column", "task_column", "batch_size")
+
+
+def is_columnar_source(predictions) -> bool:
+    """Return whether predictions is a table, file path or column instead of a list."""
+    return isinstance(predictions, TABLE_SOURCE_TYPES + COLUMN_SOURCE_TYPES)
+
+
+def iter_source_batches(
+    predictions,
+    references=None,
+    task: "TaskType | None" = None,
+    prediction_column: str = "prediction",
+    reference_column: str = "reference",
+    task_column: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[tuple[list[str], list[str], "TaskType | list[TaskType]"]]:
+    """
+    Read columnar or file-backed inputs in batches of Python lists.
+
+    Supported sources are a ``pyarrow.Table``/``RecordBatch``, a ``datasets.Dataset``
+    or a path to a Parquet, Arrow IPC or JSONL file, all read through the given column
+    names, as well as pyarrow or NumPy columns passed as predictions and references.
+    Parquet and Arrow files are memory-mapped and tables are sliced without copying,
+    so only one batch is ever converted to Python objects.
+
+    Yields:
+        Tuples of (predictions, references, task) where task is either the given task,
+        the batch's slice of a per-row task list or the per-row values of task_column.
+    """
+    if (task_column is None) == (task is None):
+        raise ValueError("exactly one of task and task_column is required")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    tasks = None if task is None or isinstance(task, str) else list(task)
+
+    if isinstance(predictions, COLUMN_SOURCE_TYPES):
+        if references is None or len(references) != len(predictions):
+            raise ValueError(
+                "references must be a column of the same length as predictions"
+            )
+        if task_column is not None:
+            raise ValueError("task_column requires a table or file source")
+        if tasks is not None and len(tasks) != len(predictions):
+            raise ValueError(
+                f"task must have one entry per prediction, "
+                f"got {len(tasks)} and {len(predictions)}"
+            )
+        for start in range(0, len(predictions), batch_size):
+            stop = start + batch_size
+            yield (
+                _column_to_list(predictions[start:stop]),
+                _column_to_list(references[start:stop]),
+                task if tasks is None else tasks[start:stop],
+            )
+        return
+
+    if references is not None:
+        raise ValueError(
+            "references must be None for table and file sources, "
+            "use reference_column instead"
+        )
+    columns = [prediction_column, reference_column]
+    if task_column is not None:
+        columns.append(task_column)
+    rows = 0
+    for batch in _iter_table_batches(predictions, columns, batch_size):
+        start, rows = rows, rows + len(batch[prediction_column])
+        if task_column is not None:
+            batch_task = batch[task_column]
+        elif tasks is not None:
+            batch_task = tasks[start:rows]
+        else:
+            batch_task = task
+        yield batch[prediction_column], batch[reference_column], batch_task
+    if tasks is not None and len(tasks) != rows:
+        raise ValueError(
+            f"task must have one entry per prediction, got {len(tasks)} and {rows}"
+        )
+
+
+def _column_to_list(column) -> list[str]:
+    """Convert a slice of a pyarrow or NumPy column to a list of strings."""
+    if isinstance(column, np.ndarray):
+        return column.tolist()
+    return column.to_pylist()
+
+
+def _iter_table_batches(
+    source, columns: list[str], batch_size: int
+) -> Iterator[dict[str, list[str]]]:
+    """Yield the given columns of a table-like source in batches."""
+    if isinstance(source, datasets.Dataset):
+        for table in (
+            source.select_columns(columns).with_format("arrow").iter(batch_size)
+        ):
+            yield table.to_pydict()
+        return
+    if isinstance(source, (pa.Table, pa.RecordBatch)):
+        for batch in source.select(columns).to_batches(max_chunksize=batch_size):
+            yield batch.to_pydict()
+        return
+
+    path = os.fspath(source)
+    if path.endswith((".jsonl", ".json")):
+        yield from _iter_jsonl_batches(path, columns, batch_size)
+    elif path.endswith((".arrow", ".feather", ".ipc")):
+        with pa.memory_map(path) as source_file:
+            try:
+                reader = pa.ipc.open_file(source_file)
+                batches = (
+                    reader.get_batch(i) for i in range(reader.num_record_batches)
+                )
+            except pa.ArrowInvalid:
+                batches = pa.ipc.open_stream(source_file)
+            for batch in batches:
+                batch = batch.select(columns)
+                for start in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(start, batch_size).to_pydict()
+    elif path.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pydict()
+    else:
+        raise ValueError(
+            f"Unsupported file type: {path}. "
+            f"Expected a .parquet, .arrow, .feather, .ipc, .jsonl or .json file"
+        )
+
+
+def _iter_jsonl_batches(
+    path: str, columns: list[str], batch_size: int
+) -> Iterator[dict[str, list[str]]]:
+    """Yield the given columns of a JSON Lines file in batches."""
+    batch = {column: [] for column in columns}
+    with open(path, encoding="utf-8") as jsonl_file:
+        for line in jsonl_file:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            for column in columns:
+                batch[column].append(row[column])
+            if len(batch[columns[0]]) == batch_size:
+                yield batch
+                batch = {column: [] for column in columns}
+    if batch[columns[0]]:
+        yield batch
+
+
+def extend_results(
+    output: "TimebenchResult", batch: "TimebenchResult", offset: int, length: int
+) -> None:
+    """Append the per-sample scores of a batch to those of the rows before it."""
+    for key, values in batch.items():
+        if key == "per_task":
+            per_task = output.setdefault("per_task", {})
+            for task, scores in values.items():
+                task_output = per_task.setdefault(task, {})
+                for score_key, score_values in scores.items():
+                    task_output.setdefault(score_key, []).extend(score_values)
+        elif key != "diagnostics":
+            output.setdefault(key, [None] * offset).extend(values)
+    for key, column in output.items():
+        if key != "per_task" and len(column) < offset + length:
+            column.extend([None] * (offset + length - len(column)))
+
+
+def _check_sample_format(sample_format: str) -> None:
+    """Reject unknown per-sample output formats."""
+    if sample_format not in SAMPLE_FORMATS:
+        raise ValueError(
+            f"sample_format must be one of {SAMPLE_FORMATS}, got {sample_format!r}"
+        )
+
+
+def compact_samples(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Cast per-sample score columns to their ``SAMPLE_DTYPES``."""
+    return {
+        key: column.astype(SAMPLE_DTYPES.get(key, np.float32))
+        for key, column in columns.items()
+    }
 
-TaskType = Literal["TempReason", "TimeQA", "MenatQA", "Date Arithmetic", "TimeDial"]
 
-SELECTED_OPTIONS_PATTERN = r"\b([A-D])(?:\.|,|\s|&|$)"
-SELECTED_OPTIONS_REGEX = re.compile(SELECTED_OPTIONS_PATTERN)
+def samples_table(
+    samples: dict[str, np.ndarray], tasks: list[str] | None = None
+) -> pa.Table:
+    """
+    Build an Arrow table of compact per-sample scores.
 
+    The table has a ``row`` index, the ``task`` of every row if ``tasks`` is given,
+    and one column per score with nulls where the score does not apply.
+    """
+    length = len(samples["exact_match"])
+    columns = {"row": pa.array(np.arange(length, dtype=np.int64))}
+    if tasks is not None:
+        columns["task"] = pa.array(tasks, pa.string()).dictionary_encode()
+    for key, column in samples.items():
+        mask = np.isnan(column) if column.dtype.kind == "f" else None
+        columns[key] = pa.array(column, mask=mask)
+    return pa.table(columns)
 
-class TimebenchResult(TypedDict, total=False):
-    exact_match: float | list[float]
-    f1: float | list[float]
+
+def option_mask_dtype(letters: str) -> type[np.unsignedinteger]:
+    """Return the smallest unsigned dtype holding the option bitmasks of an alphabet."""
+    for size, dtype in OPTION_MASK_DTYPES:
+        if len(letters) <= size:
+            return dtype
+    raise ValueError(f"at most {MAX_OPTION_LETTERS} option letters are supported")
+
+
+def popcount(masks: np.ndarray) -> np.ndarray:
+    """Number of set bits of every mask."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    return POPCOUNT_TABLE[masks.view(np.uint8).reshape(len(masks), -1)].sum(axis=1)
+
+
+def timedial_scores(
+    pred_masks: np.ndarray, ref_masks: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute set-based exact match and F1 of option bitmasks for a whole batch.
+
+    Vectorized counterpart of the core's pure-Python ``option_mask_scores``. Two
+    empty sets score an F1 of 1.0, a single empty set 0.0, and the float operations
+    are the same, so the scores are bit-identical.
+
+    Returns:
+        Tuple of (exact_match, f1) arrays; exact match holds 0/1 integers.
+    """
+    exact_matches = (pred_masks == ref_masks).astype(np.int64)
+    true_positives = popcount(pred_masks & ref_masks).astype(np.float64)
+    pred_counts = popcount(pred_masks).astype(np.float64)
+    ref_counts = popcount(ref_masks).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = true_positives / pred_counts
+        recall = true_positives / ref_counts
+        f1_scores = 2 * precision * recall / (precision + recall)
+    f1_scores[true_positives == 0] = 0.0
+    f1_scores[(pred_counts == 0) & (ref_counts == 0)] = 1.0
+    return exact_matches, f1_scores
 
 
 _CITATION = """\
@@ -65,13 +442,45 @@ Calculates evaluation metrics for temporal reasoning tasks.
 Args:
     predictions: list of prediction strings from the model. Each prediction
         should contain the marker "Thus, the correct answer is:" followed by the answer.
-    references: list of reference answer strings.
+    references: list of reference answer strings, or a ReferenceIndex of references
+        precompiled with `ReferenceIndex.build` (then `task` defaults to its tasks).
     task: the task type, one of "TempReason", "TimeQA", "MenatQA", "Date Arithmetic", or "TimeDial".
+        A list with one task per prediction scores a mixed-task set in a single call.
     return_average: if True (default), returns average scores as floats.
         If False, returns a list of scores for each sample.
+    prediction_column, reference_column, task_column: column names used when
+        predictions is a pyarrow table, a datasets.Dataset or the path of a Parquet,
+        Arrow or JSONL file (references is then omitted). predictions and references
+        may also be pyarrow or NumPy columns. These inputs are read in batches of
+        `batch_size` rows, so memory is bounded by the batch and not the dataset.
+    diagnostics: if True, also returns wall time per stage (extraction, parsing,
+        scoring, aggregation) and counters (extraction misses, parse failures, empty
+        option sets, unanswerable answers) under "diagnostics". Off by default.
+    bootstrap_resamples: if positive, also returns percentile bootstrap confidence
+        intervals of every score (and of every task for a list of tasks) under
+        "confidence_intervals". `confidence_level` (default 0.95) and `bootstrap_seed`
+        control the intervals. Streaming metrics need `keep_samples=True` for this.
+    sample_format: "list" (default), "numpy" or "arrow". "numpy" returns per-sample
+        scores as uint8 exact match and float32 f1 arrays (NaN where f1 does not
+        apply) and averages from arrays; "arrow" returns them as a table with a row
+        index (and a task column for a list of tasks) under "samples".
+    group_by: one group key per prediction (e.g. subtask level, difficulty, model or
+        prompt variant), or a dict of several such grouping columns. Every row is
+        scored once and the averages of each group are returned under "per_group"
+        next to the overall (and per_task) scores.
+Streaming:
+    Metrics created with `streaming=True` score every `add`/`add_batch` call
+    immediately (pass `task` to it) and only keep running sums and counts per task,
+    so `compute()` uses constant memory. Per-sample scores are only available with
+    `keep_samples=True`. If several tasks were added, `compute()` returns the
+    overall and per_task averages unless a single `task` is selected.
 Returns:
     exact_match: average or list of exact match scores for each prediction.
     f1: average or list of F1 scores for each prediction (for applicable tasks).
+    per_task: only for a list of tasks, the same scores broken down by task. The
+        top-level scores then cover all rows (f1 is None for Date Arithmetic rows).
+    per_group: only with group_by, the average scores of every group key, nested
+        under the column name for a dict of grouping columns.
 Examples:
     >>> timebench_eval = evaluate.load("aauss/timebench_eval")
     >>> predictions = ["Let me think... Thus, the correct answer is: Aug, 1987."]
@@ -86,9 +495,60 @@ Examples:
 class TimebenchEval(evaluate.Metric):
     """Evaluation metric for TimeBench temporal reasoning tasks."""
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        date_cache_size: int | None = DEFAULT_DATE_CACHE_SIZE,
+        streaming: bool = False,
+        keep_samples: bool = False,
+        num_workers: int = 1,
+        chunk_size: int | None = None,
+        answer_markers: Iterable[str] = (ANSWER_MARKER,),
+        result_cache: "ResultCache | str | os.PathLike | None" = None,
+        option_letters: str = DEFAULT_OPTION_LETTERS,
+        **kwargs,
+    ):
+        """
+        Args:
+            date_cache_size: Maximum number of parsed date strings memoized for
+                Date Arithmetic. None means unbounded, 0 disables the cache.
+            streaming: If True, add/add_batch score their inputs right away and only
+                running statistics per task are kept until compute().
+            keep_samples: In streaming mode, also retain per-sample scores so that
+                compute(return_average=False) is possible.
+            num_workers: Number of worker processes used for scoring. With more than
+                one worker, rows are split into chunks scored in a process pool.
+            chunk_size: Number of rows per chunk sent to a worker. Defaults to
+                splitting every batch into four chunks per worker.
+            answer_markers: Markers that introduce the final answer in a prediction.
+                The last occurrence of any of them is used.
+            result_cache: ResultCache, or the path of one, holding per-sample scores
+                of earlier runs. Rows found in it are not scored again.
+            option_letters: Option alphabet of TimeDial, one character per choice.
+        """
         super().__init__(*args, **kwargs)
-        self.squad_metric = evaluate.load("squad")
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be at least 1, got {num_workers}")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        self.streaming = streaming
+        self.keep_samples = keep_samples
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self._date_cache_size = date_cache_size
+        self._answer_extractor = AnswerExtractor(answer_markers)
+        self._option_extractor = OptionExtractor(option_letters)
+        self._option_dtype = option_mask_dtype(option_letters)
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._running: dict[str, RunningScores] = {}
+        self._stream_diagnostics: Diagnostics | None = None
+        self._parse_date = functools.lru_cache(maxsize=date_cache_size)(
+            self._parse_historical_date
+        )
 
     def _info(self) -> evaluate.MetricInfo:
         return evaluate.MetricInfo(
@@ -112,28 +572,405 @@ class TimebenchEval(evaluate.Metric):
     def _compute(
         self,
         predictions: list[str],
-        references: list[str],
-        task: TaskType,
+        references: "list[str] | ReferenceIndex",
+        task: TaskType | list[TaskType] | None = None,
         return_average: bool = True,
+        diagnostics: bool = False,
+        bootstrap_resamples: int = 0,
+        confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+        bootstrap_seed: int | None = None,
+        sample_format: SampleFormat = "list",
+        group_by: GroupBy | None = None,
     ) -> TimebenchResult:
         """
         Compute evaluation metrics for the given predictions and references.
 
         Args:
             predictions: List of prediction strings to evaluate.
-            references: List of reference strings to compare against.
-            task: Task type, one of: "TempReason", "TimeQA", "MenatQA", "Date Arithmetic", "TimeDial".
+            references: List of reference strings to compare against, or a
+                ReferenceIndex of precompiled references.
+            task: Task type, one of: "TempReason", "TimeQA", "MenatQA", "Date Arithmetic", "TimeDial",
+                or a list with one task type per prediction. Defaults to the tasks
+                stored in a ReferenceIndex.
             return_average: If True, returns average scores; if False, returns per-sample scores.
+            diagnostics: If True, also collects per-stage timings and hot-path counters.
+            bootstrap_resamples: If positive, also computes bootstrap confidence
+                intervals of every score from this many resamples.
+            confidence_level: Confidence level of the bootstrap intervals.
+            bootstrap_seed: Seed of the bootstrap resampling.
+            sample_format: "list" returns per-sample scores as Python lists. "numpy"
+                returns uint8 exact match and float32 f1 arrays (NaN where f1 does
+                not apply) and averages from float64 arrays. "arrow" returns the
+                per-sample scores as a table with a row index under "samples".
+            group_by: One group key per prediction (e.g. subtask level or prompt
+                variant), or a mapping of grouping column names to such keys. Rows
+                are still scored once; the averages of every group are added.
 
         Returns:
             Dictionary containing metric scores (exact_match and/or f1) as floats or lists.
+            For a list of tasks, it also contains the scores of each task under "per_task".
+            With group_by, the average scores of every group are under "per_group",
+            keyed by group key (and first by column name for a mapping).
+            With diagnostics, their timings and counters are under "diagnostics".
+            With bootstrap resamples, the (low, high) interval of every score is under
+            "confidence_intervals", shaped like the averages.
 
         Raises:
             ValueError: If predictions is empty.
             ValueError: If predictions and references have different lengths.
             ValueError: If task is not a valid task type.
         """
-        # Validate inputs
+        _check_sample_format(sample_format)
+        if group_by is not None:
+            check_group_by(group_by, len(predictions))
+        collector = Diagnostics() if diagnostics else NULL_DIAGNOSTICS
+        reference_index = None
+        if isinstance(references, ReferenceIndex):
+            reference_index = references
+            references, task = self._resolve_index(reference_index, task)
+        if not bootstrap_resamples and group_by is None:
+            output = self._compute_batch(
+                predictions,
+                references,
+                task,
+                return_average,
+                collector,
+                reference_index,
+                sample_format,
+            )
+        else:
+            output = self._compute_batch(
+                predictions, references, task, False, collector, reference_index
+            )
+            samples_by_task = self._samples_by_task(output, task)
+            per_group = None
+            if group_by is not None:
+                with collector.stage("aggregation"):
+                    per_group = average_by_group(
+                        {
+                            key: output[key]
+                            for key in ("exact_match", "f1")
+                            if key in output
+                        },
+                        group_by,
+                    )
+            if return_average:
+                with collector.stage("aggregation"):
+                    output = self._average_samples(samples_by_task, task)
+            per_task = "per_task" in output
+            if not return_average and sample_format != "list":
+                output = self._format_samples(output, task, sample_format)
+            if per_group is not None:
+                output["per_group"] = per_group
+            if bootstrap_resamples:
+                output["confidence_intervals"] = confidence_intervals_by_task(
+                    samples_by_task,
+                    bootstrap_resamples,
+                    confidence_level,
+                    bootstrap_seed,
+                    per_task=per_task,
+                )
+        if diagnostics:
+            output["diagnostics"] = collector.as_dict()
+        return output
+
+    def _compute_batch(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType | list[TaskType],
+        return_average: bool,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        reference_index: ReferenceIndex | None = None,
+        sample_format: SampleFormat = "list",
+    ) -> TimebenchResult:
+        """Score one in-memory batch of a single task or of a list of tasks."""
+        if not isinstance(task, str):
+            return self._compute_mixed(
+                predictions,
+                references,
+                task,
+                return_average,
+                diagnostics,
+                reference_index,
+                sample_format,
+            )
+        compiled = None
+        if reference_index is not None:
+            compiled = reference_index.compiled(task, range(len(references)))
+        results = self._score(predictions, references, task, diagnostics, compiled)
+        with diagnostics.stage("aggregation"):
+            if sample_format != "list":
+                columns = {
+                    key: np.array(values, dtype=np.float64)
+                    for key, values in results.items()
+                }
+                return self._array_output(
+                    columns, None, None, return_average, sample_format
+                )
+            if return_average:
+                return {
+                    key: sum(values) / len(values) for key, values in results.items()
+                }
+            return results
+
+    def _compute_source(
+        self,
+        predictions,
+        references=None,
+        task: TaskType | None = None,
+        return_average: bool = True,
+        diagnostics: bool = False,
+        bootstrap_resamples: int = 0,
+        confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+        bootstrap_seed: int | None = None,
+        sample_format: SampleFormat = "list",
+        group_by: GroupBy | None = None,
+        **source_options,
+    ) -> TimebenchResult:
+        """Score a columnar or file-backed input batch by batch."""
+        if group_by is not None:
+            raise ValueError(
+                "group_by is only supported for in-memory predictions, "
+                "not for tables and files"
+            )
+        _check_sample_format(sample_format)
+        collector = Diagnostics() if diagnostics else NULL_DIAGNOSTICS
+        batches = iter_source_batches(predictions, references, task, **source_options)
+        output: TimebenchResult = {}
+        if return_average:
+            running: dict[str, RunningScores] = {}
+            for batch_predictions, batch_references, batch_task in batches:
+                self._accumulate(
+                    running,
+                    batch_predictions,
+                    batch_references,
+                    batch_task,
+                    collector,
+                    keep_samples=bool(bootstrap_resamples),
+                )
+            output = finalize_running(running, task, return_average=True)
+        elif sample_format != "list" and not bootstrap_resamples:
+            output = self._source_arrays(batches, task, sample_format, collector)
+        else:
+            offset = 0
+            for batch_predictions, batch_references, batch_task in batches:
+                batch_output = self._compute_batch(
+                    batch_predictions,
+                    batch_references,
+                    batch_task,
+                    return_average=False,
+                    diagnostics=collector,
+                )
+                with collector.stage("aggregation"):
+                    extend_results(output, batch_output, offset, len(batch_predictions))
+                offset += len(batch_predictions)
+            if not offset:
+                raise ValueError("predictions cannot be empty")
+        if bootstrap_resamples:
+            if return_average:
+                samples_by_task = self._running_samples(running, task, output)
+            else:
+                samples_by_task = self._samples_by_task(output, task)
+            per_task = "per_task" in output
+            if not return_average and sample_format != "list":
+                output = self._format_samples(output, task, sample_format)
+            output["confidence_intervals"] = confidence_intervals_by_task(
+                samples_by_task,
+                bootstrap_resamples,
+                confidence_level,
+                bootstrap_seed,
+                per_task=per_task,
+            )
+        if diagnostics:
+            output["diagnostics"] = collector.as_dict()
+        return output
+
+    def _source_arrays(
+        self,
+        batches: Iterable[tuple[list[str], list[str], TaskType | list[TaskType]]],
+        task: TaskType | None,
+        sample_format: SampleFormat,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+    ) -> TimebenchResult:
+        """Score source batches into compact arrays, concatenated once at the end."""
+        parts: list[tuple[int, dict[str, np.ndarray]]] = []
+        per_task_parts: dict[str, dict[str, list[np.ndarray]]] = {}
+        tasks: list[str] = []
+        for batch_predictions, batch_references, batch_task in batches:
+            batch_output = self._compute_batch(
+                batch_predictions,
+                batch_references,
+                batch_task,
+                return_average=False,
+                diagnostics=diagnostics,
+                sample_format="numpy",
+            )
+            with diagnostics.stage("aggregation"):
+                if isinstance(batch_task, str):
+                    batch_per_task = {batch_task: batch_output}
+                    tasks.extend([batch_task] * len(batch_predictions))
+                else:
+                    batch_per_task = batch_output.pop("per_task")
+                    tasks.extend(batch_task)
+                for group_task, scores in batch_per_task.items():
+                    task_parts = per_task_parts.setdefault(group_task, {})
+                    for key, values in scores.items():
+                        task_parts.setdefault(key, []).append(values)
+                parts.append((len(batch_predictions), batch_output))
+        if not parts:
+            raise ValueError("predictions cannot be empty")
+
+        with diagnostics.stage("aggregation"):
+            keys = dict.fromkeys(key for _, batch in parts for key in batch)
+            samples = {
+                key: np.concatenate(
+                    [
+                        batch[key]
+                        if key in batch
+                        else np.full(length, np.nan, SAMPLE_DTYPES.get(key, np.float32))
+                        for length, batch in parts
+                    ]
+                )
+                for key in keys
+            }
+            if sample_format == "arrow":
+                return {"samples": samples_table(samples, None if task else tasks)}
+            if task is None:
+                samples["per_task"] = {
+                    group_task: {
+                        key: np.concatenate(values) for key, values in scores.items()
+                    }
+                    for group_task, scores in per_task_parts.items()
+                }
+            return samples
+
+    def _compute_mixed(
+        self,
+        predictions: list[str],
+        references: list[str],
+        tasks: list[TaskType],
+        return_average: bool,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        reference_index: ReferenceIndex | None = None,
+        sample_format: SampleFormat = "list",
+    ) -> TimebenchResult:
+        """Score rows of several tasks in one pass and aggregate them overall and per task."""
+        grouped = self._score_by_task(
+            predictions, references, tasks, diagnostics, reference_index
+        )
+        with diagnostics.stage("aggregation"):
+            return self._aggregate_groups(grouped, tasks, return_average, sample_format)
+
+    def _aggregate_groups(
+        self,
+        grouped: TaskScores,
+        tasks: list[TaskType],
+        return_average: bool,
+        sample_format: SampleFormat = "list",
+    ) -> TimebenchResult:
+        """Combine the scores of task groups into overall and per-task results."""
+        if sample_format != "list":
+            columns: dict[str, np.ndarray] = {}
+            per_task: dict[str, dict[str, np.ndarray]] = {}
+            for task, (indices, results) in grouped.items():
+                per_task[task] = {}
+                for key, values in results.items():
+                    values = np.array(values, dtype=np.float64)
+                    if key not in columns:
+                        columns[key] = np.full(len(tasks), np.nan)
+                    columns[key][indices] = values
+                    per_task[task][key] = values
+            return self._array_output(
+                columns, per_task, tasks, return_average, sample_format
+            )
+        return merge_task_scores(grouped, len(tasks), return_average)
+
+    def score_rows(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType | list[TaskType],
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+    ) -> TaskScores:
+        """
+        Score in-memory rows of one task or of one task per row, without averaging.
+
+        This is the batch-scoring entry point of the command-line scorer, the
+        scoring service and ``AsyncEvaluator``. It uses the result cache and the
+        process pool of the metric like ``compute``. ``merge_task_scores`` turns
+        its output into the result of ``compute``.
+
+        Returns:
+            Mapping of every task to the row indices of its rows and their
+            per-sample scores.
+
+        Raises:
+            ValueError: If the inputs are empty, their lengths differ or a task is
+                invalid.
+        """
+        if isinstance(task, str):
+            results = self._score(predictions, references, task, diagnostics)
+            return {task: (list(range(len(predictions))), results)}
+        return self._score_by_task(predictions, references, list(task), diagnostics)
+
+    def _score_by_task(
+        self,
+        predictions: list[str],
+        references: list[str],
+        tasks: list[TaskType],
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        reference_index: ReferenceIndex | None = None,
+    ) -> TaskScores:
+        """
+        Group rows by task and score each group with a single call to its scorer.
+
+        With a reference index, the precompiled references of each group are used.
+
+        Returns:
+            Mapping of task to the row indices of its group and their per-sample scores.
+        """
+        if not predictions:
+            raise ValueError("predictions cannot be empty")
+        if len(tasks) != len(predictions):
+            raise ValueError(
+                f"task must have one entry per prediction, "
+                f"got {len(tasks)} and {len(predictions)}"
+            )
+        with diagnostics.stage("aggregation"):
+            groups: dict[str, list[int]] = {}
+            for index, task in enumerate(tasks):
+                groups.setdefault(task, []).append(index)
+        return {
+            task: (
+                indices,
+                self._score(
+                    [predictions[i] for i in indices],
+                    [references[i] for i in indices],
+                    task,
+                    diagnostics,
+                    reference_index.compiled(task, indices)
+                    if reference_index is not None
+                    else None,
+                ),
+            )
+            for task, indices in groups.items()
+        }
+
+    def _score(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list | None = None,
+    ) -> dict[str, list[float]]:
+        """
+        Validate the inputs and dispatch them to the scorer of the given task.
+
+        ``compiled`` holds precompiled references (see ``ReferenceIndex.compiled``);
+        the scorers then skip normalizing, parsing or extracting the references.
+        """
         if not predictions:
             raise ValueError("predictions cannot be empty")
         if len(predictions) != len(references):
@@ -142,39 +979,581 @@ class TimebenchEval(evaluate.Metric):
                 f"got {len(predictions)} and {len(references)}"
             )
 
+        if task not in VALID_TASKS:
+            raise ValueError(
+                f"Unknown task: {task}. Expected one of: {', '.join(VALID_TASKS)}"
+            )
+
+        if self.result_cache is not None:
+            return self._score_cached(
+                predictions, references, task, diagnostics, compiled
+            )
+        return self._score_uncached(
+            predictions, references, task, diagnostics, compiled
+        )
+
+    def _score_cached(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list | None = None,
+    ) -> dict[str, list[float]]:
+        """
+        Take the scores of known rows from the result cache and score the others.
+
+        Date Arithmetic rows are only cached if the answer is missing or both sides
+        are explicit month-year dates. dateutil completes any other date from
+        today's date, so its score could change from one month to the next.
+        """
+        keys = ResultCache.keys(
+            task,
+            predictions,
+            references,
+            self._answer_extractor.markers,
+            self._option_extractor.letters,
+        )
+        cacheable = None
+        if task == TASK_DATE_ARITHMETIC:
+            cacheable = [
+                _is_month_year(reference) and (answer is None or _is_month_year(answer))
+                for answer, reference in zip(
+                    self._answer_extractor.extract_many(predictions), references
+                )
+            ]
+        cached = self.result_cache.get_many(
+            keys
+            if cacheable is None
+            else [key for key, stable in zip(keys, cacheable) if stable]
+        )
+        missing = [row for row, key in enumerate(keys) if key not in cached]
+        diagnostics.count("cache_hits", len(keys) - len(missing))
+        diagnostics.count("cache_misses", len(missing))
+        if missing:
+            scored = self._score_uncached(
+                [predictions[row] for row in missing],
+                [references[row] for row in missing],
+                task,
+                diagnostics,
+                [compiled[row] for row in missing] if compiled is not None else None,
+            )
+            fresh = [
+                {key: values[position] for key, values in scored.items()}
+                for position in range(len(missing))
+            ]
+            self.result_cache.put_many(
+                (keys[row], scores)
+                for row, scores in zip(missing, fresh)
+                if cacheable is None or cacheable[row]
+            )
+            cached.update((keys[row], scores) for row, scores in zip(missing, fresh))
+        rows = [cached[key] for key in keys]
+        return {key: [row[key] for row in rows] for key in rows[0]}
+
+    def _score_uncached(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list | None = None,
+    ) -> dict[str, list[float]]:
+        """Score the rows serially or in the process pool."""
+        if self.num_workers > 1:
+            chunk_size = self.chunk_size or -(
+                -len(predictions) // (4 * self.num_workers)
+            )
+            if len(predictions) > chunk_size:
+                return self._score_parallel(
+                    predictions, references, task, chunk_size, diagnostics, compiled
+                )
+        return self._dispatch(predictions, references, task, diagnostics, compiled)
+
+    def _dispatch(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list | None = None,
+    ) -> dict[str, list[float]]:
+        """Score the inputs with the scorer of the given task."""
         if task in SQUAD_TASKS:
-            results = self._call_squad(predictions, references)
-        elif task == TASK_DATE_ARITHMETIC:
-            results = self._compare_dates(predictions, references)
-        elif task == TASK_TIMEDIAL:
-            results = self._compute_timedial(predictions, references)
+            return self._call_squad(predictions, references, diagnostics, compiled)
+        if task == TASK_DATE_ARITHMETIC:
+            return self._compare_dates(predictions, references, diagnostics, compiled)
+        return self._compute_timedial(predictions, references, diagnostics, compiled)
+
+    def _score_parallel(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType,
+        chunk_size: int,
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list | None = None,
+    ) -> dict[str, list[float]]:
+        """
+        Score chunks of rows in the process pool and merge them back in order.
+
+        Diagnostics timings of the workers are summed, so they can exceed wall time.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    # fork is unsafe here: pyarrow has already started threads.
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(
+                        self._date_cache_size,
+                        self._answer_extractor.markers,
+                        self._option_extractor.letters,
+                    ),
+                )
+                weakref.finalize(self, self._executor.shutdown)
+        starts = range(0, len(predictions), chunk_size)
+        chunks = self._executor.map(
+            _score_chunk,
+            [task] * len(starts),
+            [predictions[start : start + chunk_size] for start in starts],
+            [references[start : start + chunk_size] for start in starts],
+            [diagnostics.enabled] * len(starts),
+            [
+                compiled[start : start + chunk_size] if compiled is not None else None
+                for start in starts
+            ],
+        )
+        results: dict[str, list[float]] = {}
+        for chunk, chunk_diagnostics in chunks:
+            for key, values in chunk.items():
+                results.setdefault(key, []).extend(values)
+            if chunk_diagnostics is not None:
+                diagnostics.merge(chunk_diagnostics)
+        return results
+
+    def add(self, *, prediction=None, reference=None, **kwargs):
+        """Add one prediction and reference; in streaming mode it is scored immediately."""
+        if not self.streaming:
+            return super().add(prediction=prediction, reference=reference, **kwargs)
+        self.add_batch(predictions=[prediction], references=[reference], **kwargs)
+
+    def add_batch(self, *, predictions=None, references=None, **kwargs):
+        """Add a batch of predictions and references; in streaming mode it is scored immediately."""
+        if not self.streaming:
+            return super().add_batch(
+                predictions=predictions, references=references, **kwargs
+            )
+        task = kwargs.pop("task", None)
+        collect_diagnostics = kwargs.pop("diagnostics", False)
+        source_options = {
+            option: kwargs.pop(option) for option in SOURCE_OPTIONS if option in kwargs
+        }
+        if kwargs:
+            raise ValueError(f"Bad inputs for streaming add_batch: {list(kwargs)}")
+        diagnostics = NULL_DIAGNOSTICS
+        if collect_diagnostics:
+            if self._stream_diagnostics is None:
+                self._stream_diagnostics = Diagnostics()
+            diagnostics = self._stream_diagnostics
+
+        reference_index = None
+        if isinstance(references, ReferenceIndex):
+            if is_columnar_source(predictions):
+                raise ValueError(
+                    "reference indexes require predictions as an in-memory list"
+                )
+            reference_index = references
+            references, task = self._resolve_index(reference_index, task)
+
+        if is_columnar_source(predictions):
+            batches = iter_source_batches(
+                predictions, references, task, **source_options
+            )
         else:
+            if task is None:
+                raise ValueError("task is required to add samples in streaming mode")
+            batches = [(list(predictions), list(references), task)]
+        for batch_predictions, batch_references, batch_task in batches:
+            self._accumulate(
+                self._running,
+                batch_predictions,
+                batch_references,
+                batch_task,
+                diagnostics,
+                self.keep_samples,
+                reference_index,
+            )
+
+    def _accumulate(
+        self,
+        running: dict[str, RunningScores],
+        predictions: list[str],
+        references: list[str],
+        task: TaskType | list[TaskType],
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        keep_samples: bool = False,
+        reference_index: ReferenceIndex | None = None,
+    ) -> None:
+        """Score a batch and add its scores to the running statistics of each task."""
+        if isinstance(task, str):
+            compiled = None
+            if reference_index is not None:
+                compiled = reference_index.compiled(task, range(len(references)))
+            results = self._score(predictions, references, task, diagnostics, compiled)
+            grouped = {task: (None, results)}
+        else:
+            grouped = self._score_by_task(
+                predictions, references, list(task), diagnostics, reference_index
+            )
+        with diagnostics.stage("aggregation"):
+            for group_task, (_, results) in grouped.items():
+                if group_task not in running:
+                    running[group_task] = RunningScores(keep_samples)
+                running[group_task].update(results)
+
+    def compute(self, *, predictions=None, references=None, **kwargs):
+        """
+        Compute the metric; in streaming mode from the running statistics.
+
+        Columnar and file-backed predictions are scored batch by batch instead of
+        being written to the Arrow cache of ``evaluate.Metric``.
+        """
+        if not self.streaming and is_columnar_source(predictions):
+            return self._compute_source(predictions, references, **kwargs)
+        if not self.streaming and isinstance(references, ReferenceIndex):
+            return self._compute(predictions, references, **kwargs)
+        if not self.streaming:
+            return super().compute(
+                predictions=predictions, references=references, **kwargs
+            )
+        task = kwargs.pop("task", None)
+        return_average = kwargs.pop("return_average", True)
+        diagnostics = kwargs.pop("diagnostics", False)
+        bootstrap_resamples = kwargs.pop("bootstrap_resamples", 0)
+        confidence_level = kwargs.pop("confidence_level", DEFAULT_CONFIDENCE_LEVEL)
+        bootstrap_seed = kwargs.pop("bootstrap_seed", None)
+        sample_format = kwargs.pop("sample_format", "list")
+        _check_sample_format(sample_format)
+        if predictions is not None or references is not None:
+            self.add_batch(
+                predictions=predictions,
+                references=references,
+                task=task,
+                diagnostics=diagnostics,
+                **kwargs,
+            )
+        elif kwargs:
+            raise ValueError(f"Bad inputs for streaming compute: {list(kwargs)}")
+
+        running, self._running = self._running, {}
+        collected, self._stream_diagnostics = self._stream_diagnostics, None
+        output = finalize_running(running, task, return_average)
+        intervals = None
+        if bootstrap_resamples:
+            intervals = confidence_intervals_by_task(
+                self._running_samples(running, task, output),
+                bootstrap_resamples,
+                confidence_level,
+                bootstrap_seed,
+                per_task="per_task" in output,
+            )
+        if not return_average and sample_format != "list":
+            output = self._format_samples(output, task, sample_format)
+        if intervals is not None:
+            output["confidence_intervals"] = intervals
+        if diagnostics or collected is not None:
+            output["diagnostics"] = (collected or Diagnostics()).as_dict()
+        return output
+
+    def compare_systems(
+        self,
+        systems: dict[str, list[str]],
+        references: "list[str] | ReferenceIndex",
+        task: TaskType | list[TaskType] | None = None,
+        return_samples: bool = False,
+    ) -> dict:
+        """
+        Score the predictions of several systems against the same references.
+
+        The references are precompiled into a ReferenceIndex once (or the given index
+        is used) and shared by every system, so references are normalized, parsed
+        and searched for options only once for the whole comparison.
+
+        Args:
+            systems: Predictions of every system, by system name.
+            references: Reference answers shared by all systems, or a ReferenceIndex.
+            task: Task type or a list with one task type per row. Defaults to the
+                tasks stored in a ReferenceIndex.
+            return_samples: If True, also return per-sample score matrices.
+
+        Returns:
+            "systems" lists the system names, "scores" maps each of them to its
+            averages, shaped like the result of compute. With return_samples,
+            "samples" maps every score to a float array of shape (systems, rows),
+            NaN where a score does not apply to a row (f1 of Date Arithmetic).
+        """
+        if not systems:
+            raise ValueError("systems cannot be empty")
+        if isinstance(references, ReferenceIndex):
+            reference_index = references
+        else:
+            if task is None:
+                raise ValueError("task is required with raw references")
+            reference_index = ReferenceIndex.build(
+                references, task, self._option_extractor.letters
+            )
+        references, task = self._resolve_index(reference_index, task)
+
+        scores = {}
+        samples: dict[str, list[list[float | None]]] = {}
+        for name, predictions in systems.items():
+            output = self._compute_batch(
+                list(predictions),
+                references,
+                task,
+                False,
+                reference_index=reference_index,
+            )
+            scores[name] = self._average_samples(
+                self._samples_by_task(output, task), task
+            )
+            if return_samples:
+                for key, values in output.items():
+                    if key != "per_task":
+                        samples.setdefault(key, []).append(values)
+        comparison = {"systems": list(systems), "scores": scores}
+        if return_samples:
+            comparison["samples"] = {
+                key: np.array(rows, dtype=np.float64) for key, rows in samples.items()
+            }
+        return comparison
+
+    def partial(
+        self,
+        predictions: Iterable[str],
+        references: "Iterable[str] | ReferenceIndex",
+        task: TaskType | list[TaskType] | None = None,
+        keep_samples: bool = False,
+    ) -> PartialResult:
+        """
+        Score the rows of one worker into a mergeable partial result.
+
+        Instead of gathering predictions through the Arrow cache files of
+        ``evaluate.Metric`` (``num_process``/``process_id``), every rank scores its
+        own shard and sends the serialized partial result to one rank, which reduces
+        them with ``merge_partials``. A shard may be empty.
+
+        Args:
+            predictions: Predictions of this worker's rows.
+            references: Their reference answers, or a ReferenceIndex of them.
+            task: Task type or a list with one task type per row. Defaults to the
+                tasks stored in a ReferenceIndex.
+            keep_samples: If True, also retain the per-sample scores.
+
+        Example:
+            >>> partial = metric.partial(shard_predictions, shard_references, tasks)
+            >>> gathered = [None] * world_size
+            >>> torch.distributed.all_gather_object(gathered, partial.to_bytes())
+            >>> merge_partials(map(PartialResult.from_bytes, gathered)).result()
+        """
+        if isinstance(references, ReferenceIndex):
+            references, task = self._resolve_index(references, task)
+        elif task is None:
+            raise ValueError("task is required with raw references")
+        predictions, references = list(predictions), list(references)
+        partial = PartialResult(keep_samples)
+        if predictions or references:
+            self._accumulate(
+                partial.running,
+                predictions,
+                references,
+                task,
+                keep_samples=keep_samples,
+            )
+        return partial
+
+    def paired_test(
+        self,
+        predictions_a: list[str],
+        predictions_b: list[str],
+        references: list[str],
+        task: TaskType | list[TaskType],
+        resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES,
+        confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+        seed: int | None = None,
+    ) -> dict:
+        """
+        Compare two systems on the same references with a paired bootstrap test.
+
+        Args:
+            predictions_a: Predictions of the first system.
+            predictions_b: Predictions of the second system, in the same row order.
+            references: Reference answers shared by both systems.
+            task: Task type or a list with one task type per row.
+            resamples: Number of bootstrap resamples.
+            confidence_level: Confidence level of the interval of the difference.
+            seed: Seed of the bootstrap resampling.
+
+        Returns:
+            For every score, the mean difference (a - b), its confidence interval and
+            the two-sided p-value. For a list of tasks, also the tests of each task
+            under "per_task".
+        """
+        if len(predictions_a) != len(predictions_b):
             raise ValueError(
-                f"Unknown task: {task}. Expected one of: {', '.join(VALID_TASKS)}"
+                f"both systems need one prediction per reference, "
+                f"got {len(predictions_a)} and {len(predictions_b)}"
             )
+        scores_a = self._compute_batch(predictions_a, references, task, False)
+        scores_b = self._compute_batch(predictions_b, references, task, False)
+        rng = np.random.default_rng(seed)
+        tests = {}
+        for key, values_a in scores_a.items():
+            if key == "per_task":
+                continue
+            # Rows of tasks without this score (f1 of Date Arithmetic) are None.
+            rows = [i for i, value in enumerate(values_a) if value is not None]
+            tests[key] = paired_bootstrap_test(
+                [values_a[i] for i in rows],
+                [scores_b[key][i] for i in rows],
+                resamples,
+                confidence_level,
+                rng,
+            )
+        if "per_task" in scores_a:
+            tests["per_task"] = {
+                group_task: {
+                    key: paired_bootstrap_test(
+                        values,
+                        scores_b["per_task"][group_task][key],
+                        resamples,
+                        confidence_level,
+                        rng,
+                    )
+                    for key, values in results.items()
+                }
+                for group_task, results in scores_a["per_task"].items()
+            }
+        return tests
+
+    @staticmethod
+    def _array_output(
+        columns: dict[str, np.ndarray],
+        per_task: dict[str, dict[str, np.ndarray]] | None,
+        tasks: list[TaskType] | None,
+        return_average: bool,
+        sample_format: SampleFormat,
+    ) -> TimebenchResult:
+        """
+        Average float64 per-sample score columns, or return them as compact arrays.
 
+        ``per_task`` and ``tasks`` are only given for a list of tasks; columns are NaN
+        for rows a score does not apply to.
+        """
         if return_average:
-            return {key: sum(values) / len(values) for key, values in results.items()}
-        return results
+            output = {key: float(np.nanmean(column)) for key, column in columns.items()}
+            if per_task is not None:
+                output["per_task"] = {
+                    task: {key: float(column.mean()) for key, column in scores.items()}
+                    for task, scores in per_task.items()
+                }
+            return output
+        samples = compact_samples(columns)
+        if sample_format == "arrow":
+            return {"samples": samples_table(samples, tasks)}
+        if per_task is not None:
+            samples["per_task"] = {
+                task: compact_samples(scores) for task, scores in per_task.items()
+            }
+        return samples
+
+    def _format_samples(
+        self,
+        output: TimebenchResult,
+        task: TaskType | list[TaskType] | None,
+        sample_format: SampleFormat,
+    ) -> TimebenchResult:
+        """Convert per-sample scores held in Python lists to ``sample_format``."""
+        columns = {
+            key: np.array(values, dtype=np.float64)
+            for key, values in output.items()
+            if key != "per_task"
+        }
+        per_task = None
+        if "per_task" in output:
+            per_task = {
+                group_task: {
+                    key: np.array(values, dtype=np.float64)
+                    for key, values in scores.items()
+                }
+                for group_task, scores in output["per_task"].items()
+            }
+        tasks = None if isinstance(task, str) or task is None else list(task)
+        return self._array_output(columns, per_task, tasks, False, sample_format)
+
+    def _resolve_index(
+        self, reference_index: ReferenceIndex, task: TaskType | list[TaskType] | None
+    ) -> tuple[list[str], TaskType | list[TaskType]]:
+        """Resolve an index, which must share the option alphabet of the metric."""
+        if reference_index.option_letters != self._option_extractor.letters:
+            raise ValueError(
+                f"reference index uses option letters "
+                f"{reference_index.option_letters!r}, the metric "
+                f"{self._option_extractor.letters!r}"
+            )
+        return reference_index.resolve(task)
+
+    @staticmethod
+    def _average_samples(
+        samples_by_task: dict[str, dict[str, list[float]]],
+        task: TaskType | list[TaskType],
+    ) -> TimebenchResult:
+        """Average per-sample scores like compute does for a task or a list of tasks."""
+        running = {}
+        for group_task, results in samples_by_task.items():
+            running[group_task] = RunningScores()
+            running[group_task].update(results)
+        if isinstance(task, str):
+            return running[task].average()
+        return average_by_task(running)
+
+    @staticmethod
+    def _samples_by_task(
+        samples: TimebenchResult, task: TaskType | list[TaskType] | None
+    ) -> dict[str, dict[str, list[float]]]:
+        """Per-sample scores of each task from a per-sample result."""
+        if "per_task" in samples:
+            return samples["per_task"]
+        return {
+            task: {key: samples[key] for key in ("exact_match", "f1") if key in samples}
+        }
+
+    @staticmethod
+    def _running_samples(
+        running: dict[str, RunningScores],
+        task: TaskType | list[TaskType] | None,
+        output: TimebenchResult,
+    ) -> dict[str, dict[str, list[float]]]:
+        """Retained per-sample scores of the tasks covered by a finalized result."""
+        if "per_task" not in output:
+            task = task if isinstance(task, str) else next(iter(running))
+            running = {task: running[task]}
+        if any(scores.samples is None for scores in running.values()):
+            raise ValueError(
+                "confidence intervals require keep_samples=True in streaming mode"
+            )
+        return {task: scores.samples for task, scores in running.items()}
 
     @staticmethod
     def _extract_answer(response: str) -> str | None:
         """Extract the answer from the response"""
-        marker = "Thus, the correct answer is:"
-
-        if marker not in response:
-            return None
-        answer = response.split(marker)[-1]
-        # Take only the first line (stops at newlines if model continues)
-        answer = answer.strip().split("\n")[0]
-        answer = answer.rstrip(".!?").strip()
-        if "unanswerable" in answer.lower():
-            return "unanswerable"
-        return answer or None
+        return DEFAULT_ANSWER_EXTRACTOR(response)
 
     def _extract_selected_options(self, text: str) -> set[str]:
         """
-        Extract selected option letters (A, B, C, D) from various formats:
+        Extract selected option letters (A, B, C, D by default) from various formats:
         - "B, C"
         - "B and C"
         - "B & C"
@@ -183,49 +1562,56 @@ class TimebenchEval(evaluate.Metric):
         - "Options B and C"
         - "The answer is B, C"
         """
-        if not text:
-            return set()
-
-        matches = SELECTED_OPTIONS_REGEX.findall(text)
-        return set(matches)
+        return self._option_extractor.options(text)
 
     def _call_squad(
-        self, predictions: list[str], references: list[str]
+        self,
+        predictions: list[str],
+        references: list[str],
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list[tuple[str, Counter]] | None = None,
     ) -> dict[str, list[float]]:
         """
-        Compute SQuAD metrics (Exact Matchand F1) for predictions and references.
+        Compute SQuAD metrics (Exact Match and F1) for predictions and references.
 
         Args:
             predictions: List of prediction strings.
             references: List of reference answer strings.
+            diagnostics: Collector for stage timings and counters.
+            compiled: Already normalized references and their token bags, if
+                precompiled.
 
         Returns:
             Dictionary with "exact_match" and "f1" keys, each containing a list of scores.
         """
-        exact_matches = []
-        f1_scores = []
-
-        for i, (pred, ref) in enumerate(zip(predictions, references)):
-            formatted_pred = [
-                {"id": "0", "prediction_text": self._extract_answer(pred) or ""}
-            ]
-            formatted_ref = [
-                {"id": "0", "answers": {"text": [ref], "answer_start": [0]}}
-            ]
-
-            results = self.squad_metric.compute(
-                predictions=formatted_pred, references=formatted_ref
+        answers = self._extract_answers(predictions, diagnostics)
+        with diagnostics.stage("parsing"):
+            pred_norms = self._map_unique(
+                _normalize_answers, answers, diagnostics, "answers"
+            )
+            ref_tokens = None
+            if compiled is not None:
+                ref_norms = [ref_norm for ref_norm, _ in compiled]
+                ref_tokens = dict(compiled)
+            else:
+                ref_norms = self._map_unique(
+                    _normalize_answers, references, diagnostics, "references"
+                )
+        with diagnostics.stage("scoring"):
+            exact_matches, f1_scores = squad_scores_normalized(
+                pred_norms, ref_norms, ref_tokens
             )
-            exact_matches.append(results["exact_match"] / 100)
-            f1_scores.append(results["f1"] / 100)
-
         return {
             "exact_match": exact_matches,
             "f1": f1_scores,
         }
 
     def _compare_dates(
-        self, predictions: list[str], references: list[str]
+        self,
+        predictions: list[str],
+        references: list[str],
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list[datetime | None] | None = None,
     ) -> dict[str, list[int]]:
         """
         Parses and compares dates in predictions and references for exact match.
@@ -233,80 +1619,163 @@ class TimebenchEval(evaluate.Metric):
         Args:
             predictions: List of prediction strings containing dates.
             references: List of reference date strings.
+            diagnostics: Collector for stage timings and counters.
+            compiled: Already parsed reference dates, if precompiled.
 
         Returns:
             Dictionary with "exact_match" key containing a list of 0/1 scores.
         """
-        predictions = [
-            self._parse_historical_date(self._extract_answer(pred))
-            for pred in predictions
-        ]
-        references = [self._parse_historical_date(ref) for ref in references]
-        return {
-            "exact_match": [
-                1 if pred == ref else 0 for pred, ref in zip(predictions, references)
-            ],
-        }
+        answers = self._extract_answers(predictions, diagnostics)
+        with diagnostics.stage("parsing"):
+            predictions = self._map_unique(
+                self._parse_dates, answers, diagnostics, "answers"
+            )
+            if compiled is not None:
+                references = compiled
+            else:
+                references = self._map_unique(
+                    self._parse_dates, references, diagnostics, "references"
+                )
+        with diagnostics.stage("scoring"):
+            exact_matches = date_matches(predictions, references)
+        if diagnostics.enabled:
+            diagnostics.count(
+                "parse_failures",
+                sum(
+                    answer is not None and pred is None
+                    for answer, pred in zip(answers, predictions)
+                )
+                + references.count(None),
+            )
+        return {"exact_match": exact_matches}
 
     def _compute_timedial(
-        self, predictions: list[str], references: list[str]
+        self,
+        predictions: list[str],
+        references: list[str],
+        diagnostics: Diagnostics = NULL_DIAGNOSTICS,
+        compiled: list[int] | None = None,
     ) -> dict[str, list[float]]:
         """
         Compute TimeDial metrics (Exact Match and F1) using set-based comparison of selected options.
 
+        Option sets are bitmasks, so the whole batch is compared with vectorized
+        AND and popcount instead of per-row set operations.
+
         Args:
             predictions: List of prediction strings.
             references: List of reference strings containing selected options.
+            diagnostics: Collector for stage timings and counters.
+            compiled: Already extracted reference option bitmasks, if precompiled.
 
         Returns:
             Dictionary with "exact_match" and "f1" keys, each containing a list of scores.
         """
-        exact_matches = []
-        f1_scores = []
-
-        for pred, ref in zip(predictions, references):
-            pred_answer = self._extract_answer(pred)  # Get text after marker
-            pred_options = (
-                self._extract_selected_options(pred_answer) if pred_answer else set()
+        pred_answers = self._extract_answers(predictions, diagnostics)
+        with diagnostics.stage("parsing"):
+            if compiled is None:
+                compiled = self._map_unique(
+                    self._option_extractor.masks, references, diagnostics, "references"
+                )
+            pred_masks = np.array(
+                self._map_unique(
+                    self._option_extractor.masks, pred_answers, diagnostics, "answers"
+                ),
+                dtype=self._option_dtype,
+            )
+            ref_masks = np.array(compiled, dtype=self._option_dtype)
+        if diagnostics.enabled:
+            diagnostics.count(
+                "empty_option_sets",
+                int(np.count_nonzero(pred_masks == 0))
+                + int(np.count_nonzero(ref_masks == 0)),
             )
-            ref_options = self._extract_selected_options(ref)
-
-            # Exact match: sets must be identical
-            em = 1 if pred_options == ref_options else 0
-            exact_matches.append(em)
 
-            # F1: set-based
-            if not pred_options and not ref_options:
-                f1 = 1.0  # Both empty = perfect match
-            elif not pred_options or not ref_options:
-                f1 = 0.0  # One empty, one not
-            else:
-                tp = len(pred_options & ref_options)
-                precision = tp / len(pred_options)
-                recall = tp / len(ref_options)
-                f1 = (
-                    2 * precision * recall / (precision + recall)
-                    if (precision + recall) > 0
-                    else 0.0
-                )
-            f1_scores.append(f1)
+        with diagnostics.stage("scoring"):
+            exact_matches, f1_scores = timedial_scores(pred_masks, ref_masks)
+            exact_matches = exact_matches.tolist()
+            f1_scores = f1_scores.tolist()
 
         return {"exact_match": exact_matches, "f1": f1_scores}
 
+    def _parse_dates(self, values: list[str | None]) -> list[datetime | None]:
+        """Parse date strings through the memoized parser."""
+        return [self._parse_date(value) for value in values]
+
     @staticmethod
-    def _parse_historical_date(date_str: str | None) -> datetime | None:
+    def _map_unique(
+        function: Callable[[list], list],
+        values: list,
+        diagnostics: Diagnostics,
+        counter: str,
+    ) -> list:
         """
-        Parse a date string and return a datetime object with day set to 1.
-
-        Args:
-            date_str: String representation of a date, or None.
+        Apply a batch function to the distinct values only and scatter the results.
 
-        Returns:
-            datetime object with day set to 1, or None if parsing fails or input is None.
+        Repeated references ("unanswerable", TimeDial options, recurring months)
+        and repeated answers are thus normalized, parsed or extracted once per batch.
+        ``counter`` and ``unique_<counter>`` count the values and distinct values.
         """
-        if date_str is None:
-            return None
-        try:
-            return parser.parse(date_str).replace(day=1)
-        except ParserError:
-            return None
+        uniques, inverse = intern_values(values)
+        diagnostics.count(counter, len(values))
+        diagnostics.count(f"unique_{counter}", len(uniques))
+        results = function(uniques)
+        return [results[position] for position in inverse]
+
+    def _extract_answers(
+        self, predictions: list[str], diagnostics: Diagnostics = NULL_DIAGNOSTICS
+    ) -> list[str | None]:
+        """Extract the answers of all predictions and count misses and unanswerables."""
+        with diagnostics.stage("extraction"):
+            answers = self._answer_extractor.extract_many(predictions)
+        if diagnostics.enabled:
+            diagnostics.count("extraction_misses", answers.count(None))
+            diagnostics.count("unanswerable", answers.count("unanswerable"))
+        return answers
+
+    def date_cache_info(self) -> functools._CacheInfo:
+        """Return hit/miss statistics of the Date Arithmetic parse cache."""
+        return self._parse_date.cache_info()
+
+    _parse_historical_date = staticmethod(parse_historical_date)
+
+
+_worker_metric: TimebenchEval | None = None
+
+
+def _is_month_year(text: str) -> bool:
+    """Whether a date string is an explicit "<month> <year>" date."""
+    match = MONTH_YEAR_REGEX.fullmatch(text)
+    return match is not None and match.group(1).lower() in MONTH_NUMBERS
+
+
+def _normalize_answers(answers: list[str | None]) -> list[str]:
+    """Normalize SQuAD answers; a missing answer normalizes like an empty one."""
+    return [normalize_squad_answer(answer or "") for answer in answers]
+
+
+def _init_worker(
+    date_cache_size: int | None, answer_markers: tuple[str, ...], option_letters: str
+) -> None:
+    """Create the serial metric instance used by a scoring worker process."""
+    global _worker_metric
+    _worker_metric = TimebenchEval(
+        date_cache_size=date_cache_size,
+        answer_markers=answer_markers,
+        option_letters=option_letters,
+    )
+
+
+def _score_chunk(
+    task: TaskType,
+    predictions: list[str],
+    references: list[str],
+    collect_diagnostics: bool,
+    compiled: list | None = None,
+) -> tuple[dict[str, list[float]], Diagnostics | None]:
+    """Score one chunk of rows inside a worker process."""
+    diagnostics = Diagnostics() if collect_diagnostics else NULL_DIAGNOSTICS
+    results = _worker_metric._dispatch(
+        predictions, references, task, diagnostics, compiled
+    )
+    return results, diagnostics if collect_diagnostics else None
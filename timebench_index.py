@@ -0,0 +1,246 @@
+"""Precompiled TimeBench references stored as memory-mapped Arrow files."""
+
+import os
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+
+import pyarrow as pa
+
+from .timebench_core import (
+    DEFAULT_OPTION_LETTERS,
+    MONTH_NUMBERS,
+    MONTH_YEAR_REGEX,
+    SQUAD_TASKS,
+    TASK_DATE_ARITHMETIC,
+    TASK_TIMEDIAL,
+    VALID_TASKS,
+    OptionExtractor,
+    TaskType,
+    normalize_squad_answer,
+    parse_historical_date,
+    squad_tokens,
+)
+
+REFERENCE_INDEX_VERSION = "2"
+REFERENCE_INDEX_SCHEMA = pa.schema(
+    [
+        ("task", pa.dictionary(pa.int8(), pa.string())),
+        ("reference", pa.string()),
+        # SQuAD tasks: reference after normalize_squad_answer.
+        ("normalized", pa.string()),
+        # SQuAD tasks: count of every token of the normalized reference.
+        ("tokens", pa.map_(pa.string(), pa.int32())),
+        # Date Arithmetic: year * 12 + month - 1 of explicit "<month> <year>" dates,
+        # null for anything dateutil completes from today's date at scoring time.
+        ("month", pa.int32()),
+        # TimeDial: bit i is set if option chr(ord("A") + i) is selected.
+        ("options", pa.uint8()),
+    ],
+    metadata={"timebench_reference_index": REFERENCE_INDEX_VERSION},
+)
+# Number of TimeDial options the "options" column has a bit for.
+OPTION_BITS = REFERENCE_INDEX_SCHEMA.field("options").type.bit_width
+
+
+class ReferenceIndex:
+    """
+    Precompiled references, so that repeated runs skip all reference-side work.
+
+    Holds the SQuAD-normalized answer and its token bag of every QA reference, the
+    month ordinal of every Date Arithmetic reference with an explicit month and year
+    and the option set of every TimeDial reference.
+    Indexes are saved as Arrow IPC files and loaded memory-mapped, so loading costs
+    next to nothing. Pass an index as ``references`` to ``compute``.
+    """
+
+    def __init__(self, table: pa.Table):
+        """
+        Args:
+            table: Table with the columns of ``REFERENCE_INDEX_SCHEMA``.
+        """
+        metadata = table.schema.metadata or {}
+        version = metadata.get(b"timebench_reference_index")
+        if version != REFERENCE_INDEX_VERSION.encode():
+            raise ValueError(
+                f"unsupported reference index version {version!r}, "
+                f"rebuild the index with ReferenceIndex.build"
+            )
+        self.table = table
+        self.option_letters = metadata.get(
+            b"timebench_option_letters", DEFAULT_OPTION_LETTERS.encode()
+        ).decode()
+        self._columns: dict[str, list] = {}
+
+    @classmethod
+    def build(
+        cls,
+        references: Iterable[str],
+        task: TaskType | Iterable[TaskType],
+        option_letters: str = DEFAULT_OPTION_LETTERS,
+    ) -> "ReferenceIndex":
+        """
+        Precompile references of a single task or with one task per reference.
+
+        ``option_letters`` is the TimeDial option alphabet, of at most eight letters.
+
+        Raises:
+            ValueError: If there are no references, the number of tasks does not
+                match or a task is not a valid task type.
+        """
+        references = list(references)
+        tasks = [task] * len(references) if isinstance(task, str) else list(task)
+        if not references:
+            raise ValueError("references cannot be empty")
+        if len(tasks) != len(references):
+            raise ValueError(
+                f"task must have one entry per reference, "
+                f"got {len(tasks)} and {len(references)}"
+            )
+        unknown = set(tasks) - VALID_TASKS
+        if unknown:
+            raise ValueError(
+                f"Unknown task: {unknown.pop()}. Expected one of: {', '.join(VALID_TASKS)}"
+            )
+
+        option_extractor = OptionExtractor(option_letters)
+        if len(option_extractor.letters) > OPTION_BITS:
+            raise ValueError("reference indexes support at most eight option letters")
+        normalized, tokens, months, options = [], [], [], []
+        for reference, row_task in zip(references, tasks):
+            normalized_reference = None
+            if row_task in SQUAD_TASKS:
+                normalized_reference = normalize_squad_answer(reference)
+            normalized.append(normalized_reference)
+            tokens.append(
+                squad_tokens(normalized_reference)
+                if normalized_reference is not None
+                else None
+            )
+            month = None
+            if row_task == TASK_DATE_ARITHMETIC:
+                # Only explicit month-year dates are stored; dateutil fills missing
+                # fields from today's date, so the rest is parsed at scoring time.
+                match = MONTH_YEAR_REGEX.fullmatch(reference)
+                if match and match.group(1).lower() in MONTH_NUMBERS:
+                    month_number = MONTH_NUMBERS[match.group(1).lower()]
+                    month = int(match.group(2)) * 12 + month_number - 1
+            months.append(month)
+            options.append(
+                option_extractor.mask(reference) if row_task == TASK_TIMEDIAL else None
+            )
+
+        schema = REFERENCE_INDEX_SCHEMA.with_metadata(
+            {
+                **REFERENCE_INDEX_SCHEMA.metadata,
+                b"timebench_option_letters": option_letters.encode(),
+            }
+        )
+        return cls(
+            pa.table(
+                {
+                    "task": pa.array(tasks).dictionary_encode(),
+                    "reference": references,
+                    "normalized": normalized,
+                    "tokens": tokens,
+                    "month": months,
+                    "options": options,
+                },
+                schema=schema,
+            )
+        )
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Write the index as an Arrow IPC file."""
+        with (
+            pa.OSFile(os.fspath(path), "wb") as sink,
+            pa.ipc.new_file(sink, self.table.schema) as writer,
+        ):
+            writer.write_table(self.table)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "ReferenceIndex":
+        """Memory-map an index written by ``save``."""
+        source = pa.memory_map(os.fspath(path))
+        return cls(pa.ipc.open_file(source).read_all())
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def _column(self, name: str) -> list:
+        """Return a column as a Python list, converted once."""
+        if name not in self._columns:
+            column = self.table.column(name)
+            if pa.types.is_dictionary(column.type):
+                # Decoding through the dictionary is much faster than to_pylist.
+                column = column.combine_chunks()
+                values = column.dictionary.to_pylist()
+                self._columns[name] = [values[i] for i in column.indices.to_pylist()]
+            else:
+                self._columns[name] = column.to_pylist()
+        return self._columns[name]
+
+    def resolve(
+        self, task: TaskType | list[TaskType] | None = None
+    ) -> tuple[list[str], TaskType | list[TaskType]]:
+        """
+        Return the raw references and the task argument to score them with.
+
+        Without a task, the tasks stored in the index are used: their single task
+        if all rows share it, or else the list of row tasks.
+
+        Raises:
+            ValueError: If the given task does not match the tasks of the index.
+        """
+        tasks = self._column("task")
+        if task is None:
+            task = tasks[0] if tasks.count(tasks[0]) == len(tasks) else tasks
+        elif isinstance(task, str):
+            if any(row_task != task for row_task in tasks):
+                raise ValueError(f"the reference index is not all of task {task}")
+        elif list(task) != tasks:
+            raise ValueError("task does not match the tasks of the reference index")
+        return self._column("reference"), task
+
+    def _dates(self) -> list[datetime | None]:
+        """Return the parsed date of every Date Arithmetic row, built once."""
+        if "dates" not in self._columns:
+            dates = []
+            for task, month, reference in zip(
+                self._column("task"), self._column("month"), self._column("reference")
+            ):
+                if task != TASK_DATE_ARITHMETIC:
+                    dates.append(None)
+                elif month is not None:
+                    dates.append(datetime(month // 12, month % 12 + 1, 1))
+                else:
+                    dates.append(parse_historical_date(reference))
+            self._columns["dates"] = dates
+        return self._columns["dates"]
+
+    def _tokens(self) -> list[Counter | None]:
+        """Return the token bag of every SQuAD row, built once."""
+        if "token_bags" not in self._columns:
+            self._columns["token_bags"] = [
+                Counter(dict(pairs)) if pairs is not None else None
+                for pairs in self._column("tokens")
+            ]
+        return self._columns["token_bags"]
+
+    def compiled(self, task: TaskType, rows: Iterable[int]) -> list:
+        """
+        Return the precompiled references of some rows of one task.
+
+        These are (normalized answer, token bag) pairs for SQuAD tasks, parsed dates
+        for Date Arithmetic and option bitmasks for TimeDial, as the scorers compute
+        them.
+        """
+        if task in SQUAD_TASKS:
+            normalized = self._column("normalized")
+            tokens = self._tokens()
+            return [(normalized[row], tokens[row]) for row in rows]
+        if task == TASK_DATE_ARITHMETIC:
+            dates = self._dates()
+            return [dates[row] for row in rows]
+        options = self._column("options")
+        return [options[row] for row in rows]
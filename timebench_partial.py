@@ -0,0 +1,110 @@
+"""Mergeable partial results for distributed TimeBench evaluation."""
+
+import json
+import zlib
+from collections.abc import Iterable
+
+from .timebench_core import SCORING_VERSION, TaskType
+from .timebench_scores import RunningScores, TimebenchResult, finalize_running
+
+
+class PartialResult:
+    """
+    Mergeable partial result of one worker of a distributed evaluation.
+
+    Holds the per-task sums and counts of the scores, plus per-sample shards if
+    created with ``keep_samples``. Every rank scores its own rows locally, and the
+    partial results are merged or serialized with ``to_bytes`` and reduced on one
+    rank, so raw predictions never need to be gathered. Merging is associative;
+    merge in rank order to keep per-sample scores in row order.
+    """
+
+    def __init__(self, keep_samples: bool = False):
+        """
+        Args:
+            keep_samples: If True, also retain the per-sample scores.
+        """
+        self.keep_samples = keep_samples
+        self.running: dict[str, RunningScores] = {}
+
+    @property
+    def rows(self) -> int:
+        """Number of scored rows."""
+        return sum(
+            max(scores.counts.values(), default=0) for scores in self.running.values()
+        )
+
+    def merge(self, other: "PartialResult") -> None:
+        """
+        Add the scores of another partial result.
+
+        Raises:
+            ValueError: If only one of both retains per-sample scores.
+        """
+        if other.keep_samples != self.keep_samples:
+            raise ValueError("cannot merge partial results with and without samples")
+        for task, scores in other.running.items():
+            if task not in self.running:
+                self.running[task] = RunningScores(self.keep_samples)
+            self.running[task].merge(scores)
+
+    def result(
+        self,
+        task: TaskType | list[TaskType] | None = None,
+        return_average: bool = True,
+    ) -> TimebenchResult:
+        """
+        Return the final scores, shaped like the result of compute.
+
+        Several tasks give overall averages plus a per_task breakdown; per-sample
+        scores are only available for a single task and with keep_samples.
+        """
+        return finalize_running(self.running, task, return_average)
+
+    def to_bytes(self) -> bytes:
+        """Serialize to compressed JSON, which restores float sums exactly."""
+        state = {
+            "scoring_version": SCORING_VERSION,
+            "keep_samples": self.keep_samples,
+            "tasks": {task: scores.as_dict() for task, scores in self.running.items()},
+        }
+        return zlib.compress(json.dumps(state, separators=(",", ":")).encode())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PartialResult":
+        """
+        Restore a partial result serialized with to_bytes.
+
+        Raises:
+            ValueError: If it was scored with another ``SCORING_VERSION``.
+        """
+        state = json.loads(zlib.decompress(data))
+        if state["scoring_version"] != SCORING_VERSION:
+            raise ValueError(
+                f"partial result of scoring version {state['scoring_version']!r} "
+                f"cannot be merged with version {SCORING_VERSION!r}"
+            )
+        partial = cls(state["keep_samples"])
+        partial.running = {
+            task: RunningScores.from_dict(scores)
+            for task, scores in state["tasks"].items()
+        }
+        return partial
+
+
+def merge_partials(partials: Iterable[PartialResult]) -> PartialResult:
+    """
+    Reduce the partial results of all ranks, in rank order, into one.
+
+    Raises:
+        ValueError: If partials is empty.
+    """
+    partials = iter(partials)
+    first = next(partials, None)
+    if first is None:
+        raise ValueError("partials cannot be empty")
+    merged = PartialResult(first.keep_samples)
+    merged.merge(first)
+    for partial in partials:
+        merged.merge(partial)
+    return merged
@@ -0,0 +1,214 @@
+"""Running and per-group aggregation of TimeBench per-sample scores."""
+
+from collections.abc import Hashable, Mapping
+from typing import TypedDict
+
+import numpy as np
+import pyarrow as pa
+
+from .timebench_core import TaskType
+
+# One group key per row, or several named columns of them.
+GroupBy = list[Hashable] | Mapping[str, list[Hashable]]
+# Per task: the row indices of its rows and their per-sample scores.
+TaskScores = dict[str, tuple[list[int], dict[str, list[float]]]]
+
+
+class TimebenchResult(TypedDict, total=False):
+    exact_match: float | list[float] | np.ndarray
+    f1: float | list[float] | np.ndarray
+    per_task: dict[str, "TimebenchResult"]
+    per_group: dict
+    samples: pa.Table
+    diagnostics: dict[str, dict[str, float]]
+    confidence_intervals: dict
+
+
+class RunningScores:
+    """
+    Running sums and counts of per-sample scores.
+
+    Sums use Neumaier compensation, which is what the built-in ``sum`` does for floats,
+    so the streamed average equals averaging the full per-sample lists.
+    """
+
+    def __init__(self, keep_samples: bool = False):
+        """
+        Args:
+            keep_samples: If True, also retain the per-sample scores.
+        """
+        self.counts: dict[str, int] = {}
+        self._sums: dict[str, tuple[float, float]] = {}
+        self.samples: dict[str, list[float]] | None = {} if keep_samples else None
+
+    def update(self, results: dict[str, list[float]]) -> None:
+        """Add the per-sample scores of one scored batch."""
+        for key, values in results.items():
+            total, compensation = self._sums.get(key, (0.0, 0.0))
+            for value in values:
+                total, compensation = _neumaier_add(total, compensation, value)
+            self._sums[key] = (total, compensation)
+            self.counts[key] = self.counts.get(key, 0) + len(values)
+            if self.samples is not None:
+                self.samples.setdefault(key, []).extend(values)
+
+    def merge(self, other: "RunningScores") -> None:
+        """Add the sums, counts and retained samples of another accumulator."""
+        for key, (other_total, other_compensation) in other._sums.items():
+            total, compensation = self._sums.get(key, (0.0, 0.0))
+            total, compensation = _neumaier_add(total, compensation, other_total)
+            self._sums[key] = (total, compensation + other_compensation)
+            self.counts[key] = self.counts.get(key, 0) + other.counts[key]
+        if self.samples is not None and other.samples is not None:
+            for key, values in other.samples.items():
+                self.samples.setdefault(key, []).extend(values)
+
+    def average(self) -> dict[str, float]:
+        """Return the average of every score seen so far."""
+        return {
+            key: (total + compensation) / self.counts[key]
+            for key, (total, compensation) in self._sums.items()
+        }
+
+    def as_dict(self) -> dict:
+        """Return the sums, counts and retained samples as plain JSON values."""
+        state = {
+            "counts": self.counts,
+            "sums": {key: list(value) for key, value in self._sums.items()},
+        }
+        if self.samples is not None:
+            state["samples"] = self.samples
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RunningScores":
+        """Restore an accumulator from the output of as_dict."""
+        scores = cls(keep_samples="samples" in state)
+        scores.counts = dict(state["counts"])
+        scores._sums = {key: tuple(value) for key, value in state["sums"].items()}
+        if scores.samples is not None:
+            scores.samples = {
+                key: list(value) for key, value in state["samples"].items()
+            }
+        return scores
+
+
+def _neumaier_add(
+    total: float, compensation: float, value: float
+) -> tuple[float, float]:
+    """Add value to a compensated running sum."""
+    new_total = total + value
+    if abs(total) >= abs(value):
+        compensation += (total - new_total) + value
+    else:
+        compensation += (value - new_total) + total
+    return new_total, compensation
+
+
+def average_by_task(running: dict[str, RunningScores]) -> TimebenchResult:
+    """Combine per-task accumulators into overall averages plus a per_task breakdown."""
+    overall = RunningScores()
+    for scores in running.values():
+        overall.merge(scores)
+    return {
+        **overall.average(),
+        "per_task": {task: scores.average() for task, scores in running.items()},
+    }
+
+
+def finalize_running(
+    running: dict[str, RunningScores],
+    task: TaskType | list[TaskType] | None,
+    return_average: bool,
+) -> TimebenchResult:
+    """Turn the running statistics of a streaming metric into its result."""
+    if not running:
+        raise ValueError("predictions cannot be empty")
+    if not isinstance(task, str):
+        if len(running) > 1:
+            if not return_average:
+                raise ValueError(
+                    "per-sample scores of several tasks cannot be streamed, "
+                    "pass a single task to compute()"
+                )
+            return average_by_task(running)
+        task = next(iter(running))
+    if task not in running:
+        raise ValueError(f"no samples of task {task} were added")
+
+    scores = running[task]
+    if return_average:
+        return scores.average()
+    if scores.samples is None:
+        raise ValueError(
+            "per-sample scores require keep_samples=True in streaming mode"
+        )
+    return dict(scores.samples)
+
+
+def merge_task_scores(
+    grouped: TaskScores, rows: int, return_average: bool
+) -> TimebenchResult:
+    """
+    Combine the per-task scores of ``TimebenchEval.score_rows`` like ``compute``.
+
+    Returns:
+        Overall and per-task averages, or row-aligned per-sample scores (None
+        where a score does not apply to a row's task) plus a per_task breakdown.
+    """
+    if return_average:
+        running = {}
+        for task, (_, results) in grouped.items():
+            running[task] = RunningScores()
+            running[task].update(results)
+        return average_by_task(running)
+
+    samples: dict[str, list[float | None]] = {}
+    for indices, results in grouped.values():
+        for key, values in results.items():
+            column = samples.setdefault(key, [None] * rows)
+            for index, value in zip(indices, values):
+                column[index] = value
+    return {
+        **samples,
+        "per_task": {task: results for task, (_, results) in grouped.items()},
+    }
+
+
+def check_group_by(group_by: GroupBy, rows: int) -> None:
+    """Raise if a grouping column does not hold one key per row."""
+    columns = group_by.items() if isinstance(group_by, Mapping) else [(None, group_by)]
+    for name, keys in columns:
+        if len(keys) != rows:
+            label = "group_by" if name is None else f"group_by column {name!r}"
+            raise ValueError(
+                f"{label} must have one key per prediction, got {len(keys)} and {rows}"
+            )
+
+
+def average_by_group(samples: dict[str, list[float | None]], group_by: GroupBy) -> dict:
+    """
+    Average row-aligned per-sample scores per group key in a single hashed pass.
+
+    Rows are bucketed by key in a dict and every bucket is averaged like a task;
+    None marks a score that does not apply to a row (f1 of Date Arithmetic).
+
+    Returns:
+        Averages by key, or by column name and key if group_by maps names to keys.
+    """
+    if isinstance(group_by, Mapping):
+        return {
+            name: average_by_group(samples, keys) for name, keys in group_by.items()
+        }
+    buckets: dict[Hashable, list[int]] = {}
+    for index, key in enumerate(group_by):
+        buckets.setdefault(key, []).append(index)
+    per_group = {}
+    for key, indices in buckets.items():
+        scores = RunningScores()
+        for name, values in samples.items():
+            group_values = [values[i] for i in indices if values[i] is not None]
+            if group_values:
+                scores.update({name: group_values})
+        per_group[key] = scores.average()
+    return per_group
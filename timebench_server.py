@@ -0,0 +1,431 @@
+"""Long-running HTTP scoring service that keeps one warm ``TimebenchEval``.
+
+Concurrent requests are coalesced into micro-batches per task: rows of a task are
+queued until ``max_batch_size`` rows are waiting or the oldest request has waited
+``max_delay`` seconds, and then scored with a single call to the task's scorer.
+Small online-eval jobs thus skip the metric's startup cost and share its caches.
+
+Endpoints:
+    POST /score   {"predictions": [...], "references": [...], "task": "TimeQA" or a
+                  list with one task per row, "return_average": true}; responds
+                  like ``compute``. Errors are {"error": ...}, with status 400
+                  for invalid requests and 500 if scoring fails.
+    GET  /stats   request, row and batch counts, throughput and latency percentiles.
+    GET  /health  {"status": "ok"}.
+
+Example:
+    timebench-serve --port 8000 --max-batch-size 1024 --max-delay 0.005
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .timebench_core import ANSWER_MARKER, VALID_TASKS, TaskType
+from .timebench_eval import TimebenchEval
+from .timebench_scores import TimebenchResult, merge_task_scores
+
+DEFAULT_SERVER_MAX_BATCH_SIZE = 1024
+DEFAULT_SERVER_MAX_DELAY = 0.005
+# Latencies of this many most recent requests are kept for the percentiles.
+LATENCY_WINDOW = 10_000
+LATENCY_PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class _Request:
+    """Rows of one task submitted by one caller, and the future of their scores."""
+
+    __slots__ = ("deadline", "future", "predictions", "references")
+
+    def __init__(self, predictions: list[str], references: list[str], deadline: float):
+        self.predictions = predictions
+        self.references = references
+        self.deadline = deadline
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """
+    Coalesce the scoring requests of many threads into micro-batches per task.
+
+    Thread-safety: ``submit``, ``score`` and ``stats`` may be called from any number
+    of threads at once. Request threads only append to the per-task queues under a
+    condition variable and wait for their futures. The shared metric is only called
+    by the batcher's single scoring thread. Batches of all tasks are therefore
+    scored one after another, and they never compete for its process pool.
+    """
+
+    def __init__(
+        self,
+        metric: TimebenchEval | None = None,
+        max_batch_size: int = DEFAULT_SERVER_MAX_BATCH_SIZE,
+        max_delay: float = DEFAULT_SERVER_MAX_DELAY,
+    ):
+        """
+        Args:
+            metric: Warm metric used for scoring; a default TimebenchEval if omitted.
+            max_batch_size: Number of rows at which a task's batch is scored without
+                waiting further. A single larger request is scored as one batch.
+            max_delay: Seconds the oldest queued request of a task waits for more
+                rows before its batch is scored.
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        if max_delay < 0:
+            raise ValueError(f"max_delay cannot be negative, got {max_delay}")
+        self.metric = metric if metric is not None else TimebenchEval()
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._queues: dict[str, deque[_Request]] = {}
+        self._queued_rows: dict[str, int] = {}
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._started = time.monotonic()
+        self._requests = 0
+        self._rows = 0
+        self._batches = 0
+        self._batch_rows_max = 0
+        self._scoring_seconds = 0.0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+        self._thread = threading.Thread(
+            target=self._run, name="timebench-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self, predictions: list[str], references: list[str], task: TaskType
+    ) -> Future:
+        """
+        Queue the rows of a single task and return the future of their scores.
+
+        Raises:
+            ValueError: If predictions is empty, the lengths differ or task is invalid.
+            TypeError: If a prediction or reference is not a string.
+            RuntimeError: If the batcher is closed.
+        """
+        if not predictions:
+            raise ValueError("predictions cannot be empty")
+        if len(predictions) != len(references):
+            raise ValueError(
+                f"predictions and references must have same length, "
+                f"got {len(predictions)} and {len(references)}"
+            )
+        # Rows are merged with other callers' rows, so a bad value must be caught
+        # here rather than failing the whole batch.
+        for name, values in (("predictions", predictions), ("references", references)):
+            for row, value in enumerate(values):
+                if not isinstance(value, str):
+                    raise TypeError(
+                        f"{name} must be strings, got {type(value).__name__} "
+                        f"at row {row}"
+                    )
+        if task not in VALID_TASKS:
+            raise ValueError(
+                f"Unknown task: {task}. Expected one of: {', '.join(VALID_TASKS)}"
+            )
+        request = _Request(
+            list(predictions), list(references), time.monotonic() + self.max_delay
+        )
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("the batcher is closed")
+            self._queues.setdefault(task, deque()).append(request)
+            self._queued_rows[task] = self._queued_rows.get(task, 0) + len(predictions)
+            self._condition.notify()
+        return request.future
+
+    def score(
+        self,
+        predictions: list[str],
+        references: list[str],
+        task: TaskType | list[TaskType],
+        return_average: bool = True,
+    ) -> TimebenchResult:
+        """
+        Score one request, blocking until all of its micro-batches are scored.
+
+        Returns:
+            The same result as ``compute`` with these arguments.
+        """
+        start = time.perf_counter()
+        if isinstance(task, str):
+            results = self.submit(predictions, references, task).result()
+            output = results
+            if return_average:
+                output = {
+                    key: sum(values) / len(values) for key, values in results.items()
+                }
+        else:
+            if not predictions:
+                raise ValueError("predictions cannot be empty")
+            if len(task) != len(predictions) or len(references) != len(predictions):
+                raise ValueError(
+                    "predictions, references and task must have the same length"
+                )
+            groups: dict[str, list[int]] = {}
+            for index, row_task in enumerate(task):
+                groups.setdefault(row_task, []).append(index)
+            futures = {
+                row_task: (
+                    indices,
+                    self.submit(
+                        [predictions[index] for index in indices],
+                        [references[index] for index in indices],
+                        row_task,
+                    ),
+                )
+                for row_task, indices in groups.items()
+            }
+            grouped = {
+                row_task: (indices, future.result())
+                for row_task, (indices, future) in futures.items()
+            }
+            output = merge_task_scores(grouped, len(task), return_average)
+        with self._stats_lock:
+            self._requests += 1
+            self._latencies.append(time.perf_counter() - start)
+        return output
+
+    def stats(self) -> dict:
+        """Return counters, throughput and request latency percentiles in seconds."""
+        with self._condition:
+            queued_rows = sum(self._queued_rows.values())
+        with self._stats_lock:
+            uptime = time.monotonic() - self._started
+            latencies = sorted(self._latencies)
+            stats = {
+                "uptime_seconds": uptime,
+                "requests": self._requests,
+                "rows": self._rows,
+                "batches": self._batches,
+                "queued_rows": queued_rows,
+                "mean_batch_rows": self._rows / self._batches if self._batches else 0.0,
+                "max_batch_rows": self._batch_rows_max,
+                "rows_per_second": self._rows / uptime,
+                "scoring_seconds": self._scoring_seconds,
+            }
+        latency = {}
+        if latencies:
+            latency["mean"] = sum(latencies) / len(latencies)
+            for percentile in LATENCY_PERCENTILES:
+                position = min(len(latencies) - 1, int(percentile * len(latencies)))
+                latency[f"p{percentile * 100:g}"] = latencies[position]
+            latency["max"] = latencies[-1]
+        stats["latency_seconds"] = latency
+        return stats
+
+    def close(self) -> None:
+        """Score the rows still queued and stop the scoring thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Scoring thread: wait for a full or expired batch of a task and score it."""
+        while True:
+            with self._condition:
+                while True:
+                    task = self._ready_task()
+                    if task is not None:
+                        break
+                    if self._closed:
+                        return
+                    deadlines = [
+                        queue[0].deadline for queue in self._queues.values() if queue
+                    ]
+                    timeout = None
+                    if deadlines:
+                        timeout = max(0.0, min(deadlines) - time.monotonic())
+                    self._condition.wait(timeout)
+                batch = self._take(task)
+            self._score_batch(task, batch)
+
+    def _ready_task(self) -> str | None:
+        """Return the task whose batch is due with the oldest request, if any."""
+        now = time.monotonic()
+        ready = [
+            (queue[0].deadline, task)
+            for task, queue in self._queues.items()
+            if queue
+            and (
+                self._closed
+                or queue[0].deadline <= now
+                or self._queued_rows[task] >= self.max_batch_size
+            )
+        ]
+        return min(ready)[1] if ready else None
+
+    def _take(self, task: str) -> list[_Request]:
+        """Dequeue requests of a task up to max_batch_size rows (at least one)."""
+        queue = self._queues[task]
+        batch = [queue.popleft()]
+        rows = len(batch[0].predictions)
+        while queue and rows + len(queue[0].predictions) <= self.max_batch_size:
+            batch.append(queue.popleft())
+            rows += len(batch[-1].predictions)
+        self._queued_rows[task] -= rows
+        return batch
+
+    def _score_batch(self, task: str, batch: list[_Request]) -> None:
+        """
+        Score a batch with one scorer call and hand every request its rows.
+
+        If the call fails, every request of the batch is rescored on its own, so
+        only the requests that fail by themselves receive the error.
+        """
+        predictions = [row for request in batch for row in request.predictions]
+        references = [row for request in batch for row in request.references]
+        start = time.perf_counter()
+        try:
+            results = self.metric.score_rows(predictions, references, task)[task][1]
+        except Exception as error:  # noqa: BLE001 - forwarded to the callers
+            if len(batch) == 1:
+                batch[0].future.set_exception(error)
+                return
+            for request in batch:
+                self._score_batch(task, [request])
+            return
+        elapsed = time.perf_counter() - start
+        offset = 0
+        for request in batch:
+            stop = offset + len(request.predictions)
+            request.future.set_result(
+                {key: values[offset:stop] for key, values in results.items()}
+            )
+            offset = stop
+        with self._stats_lock:
+            self._rows += len(predictions)
+            self._batches += 1
+            self._batch_rows_max = max(self._batch_rows_max, len(predictions))
+            self._scoring_seconds += elapsed
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """HTTP server handling every connection in its own thread with a shared batcher."""
+
+    daemon_threads = True
+    # The socketserver default of 5 resets connections under bursts of clients.
+    request_queue_size = 128
+
+    def __init__(
+        self, address: tuple[str, int], batcher: MicroBatcher, quiet: bool = False
+    ):
+        super().__init__(address, ScoringHandler)
+        self.batcher = batcher
+        self.quiet = quiet
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """JSON endpoints of the scoring service."""
+
+    server: ScoringServer
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            self._send(HTTPStatus.OK, self.server.batcher.stats())
+        elif self.path == "/health":
+            self._send(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/score":
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length))
+            output = self.server.batcher.score(
+                body["predictions"],
+                body["references"],
+                body["task"],
+                body.get("return_average", True),
+            )
+        except KeyError as error:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": f"missing field {error}"})
+            return
+        except (TypeError, ValueError) as error:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+            return
+        except Exception as error:  # noqa: BLE001 - reported to the client
+            self._send(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {"error": f"{type(error).__name__}: {error}"},
+            )
+            return
+        self._send(HTTPStatus.OK, output)
+
+    def _send(self, status: HTTPStatus, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="timebench-serve",
+        description="Serve TimeBench scoring over HTTP with one warm metric.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--max-batch-size", type=int, default=DEFAULT_SERVER_MAX_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--max-delay",
+        type=float,
+        default=DEFAULT_SERVER_MAX_DELAY,
+        help="seconds a request waits for more rows of its task",
+    )
+    parser.add_argument("--num-workers", type=int, default=1)
+    parser.add_argument(
+        "--answer-marker",
+        action="append",
+        help="answer marker (repeatable), defaults to the TimeBench marker",
+    )
+    parser.add_argument(
+        "--cache", help="result cache file; only new or changed rows are scored"
+    )
+    parser.add_argument("--quiet", action="store_true", help="do not log requests")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metric = TimebenchEval(
+        num_workers=args.num_workers,
+        answer_markers=args.answer_marker or (ANSWER_MARKER,),
+        result_cache=args.cache,
+    )
+    batcher = MicroBatcher(metric, args.max_batch_size, args.max_delay)
+    server = ScoringServer((args.host, args.port), batcher, quiet=args.quiet)
+    print(f"serving on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())